@@ -3,6 +3,7 @@ from __future__ import unicode_literals
 
 from rest_framework import serializers
 
+from contest.catalog import catalog
 from contest.models import (
     Contact,
     Contest,
@@ -18,6 +19,73 @@ from contest.models import (
 )
 
 
+class DynamicFieldsMixin(object):
+    """
+    Serializer taking `fields` and `expand` keyword arguments, which limit
+    the rendered fields and choose the related fields to be nested.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        self.expand = set(kwargs.pop('expand', None) or ())
+        super(DynamicFieldsMixin, self).__init__(*args, **kwargs)
+
+        if fields:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+
+class ExpandableRelatedField(serializers.RelatedField):
+    """
+    A related object rendered as its primary key, unless the field is
+    listed in parent's `expand`. Nested representations are cached in
+    the serializer's context, so each distinct object is serialized once.
+    """
+
+    def __init__(self, serializer_class, **kwargs):
+        self.serializer_class = serializer_class
+        kwargs['read_only'] = True
+        super(ExpandableRelatedField, self).__init__(**kwargs)
+
+    @property
+    def is_expanded(self):
+        return self.field_name in getattr(self.parent, 'expand', ())
+
+    def use_pk_only_optimization(self):
+        return not self.is_expanded
+
+    def to_representation(self, value):
+        if not self.is_expanded:
+            return value.pk
+
+        cache = self.context.setdefault('expanded_objects', {})
+        key = (self.serializer_class, value.pk)
+        if key not in cache:
+            cache[key] = self.serializer_class(
+                value, context=self.context
+            ).data
+        return cache[key]
+
+
+class CatalogRelatedField(serializers.RelatedField):
+    """
+    A `Style` or `Distance` relation resolved from the in-process catalog
+    instead of the database and rendered with `serializer_class`.
+    """
+
+    def __init__(self, serializer_class, **kwargs):
+        self.serializer_class = serializer_class
+        kwargs['read_only'] = True
+        super(CatalogRelatedField, self).__init__(**kwargs)
+
+    def use_pk_only_optimization(self):
+        return True
+
+    def to_representation(self, value):
+        obj = catalog.get(self.serializer_class.Meta.model, value.pk)
+        return self.serializer_class(obj, context=self.context).data
+
+
 class ContactSerializer(serializers.ModelSerializer):
     class Meta:
         model = Contact
@@ -84,8 +152,10 @@ class DistanceSerializer(serializers.HyperlinkedModelSerializer):
 
 
 class ContestStyleDistancesSerializer(serializers.HyperlinkedModelSerializer):
-    distance = DistanceSerializer(read_only=True, many=True)
-    style = StyleSerializer(read_only=True)
+    distance = DistanceSerializer(
+        read_only=True, many=True, source='distances'
+    )
+    style = CatalogRelatedField(StyleSerializer)
 
     class Meta:
         model = ContestStyleDistances
@@ -121,8 +191,8 @@ class RushUserSerializer(serializers.HyperlinkedModelSerializer):
 
 
 class ContestantScoreSerializer(serializers.HyperlinkedModelSerializer):
-    style = StyleSerializer(read_only=True)
-    distance = DistanceSerializer(read_only=True)
+    style = CatalogRelatedField(StyleSerializer)
+    distance = CatalogRelatedField(DistanceSerializer)
     contestant = serializers.ReadOnlyField(
         source='contestant.__unicode__', read_only=True
     )
@@ -132,9 +202,11 @@ class ContestantScoreSerializer(serializers.HyperlinkedModelSerializer):
         fields = ('contestant', 'style', 'distance', 'time_result')
 
 
-class ContestantSerializer(serializers.HyperlinkedModelSerializer):
-    contest = ContestSerializer()
-    moderator = RushUserSerializer()
+class ContestantSerializer(
+    DynamicFieldsMixin, serializers.HyperlinkedModelSerializer
+):
+    contest = ExpandableRelatedField(ContestSerializer)
+    moderator = ExpandableRelatedField(RushUserSerializer)
     gender = serializers.CharField(source='get_gender_display')
     school = serializers.CharField(source='get_school_display')
     score = ContestantScoreSerializer(source='contestantscore_set', many=True)
@@ -1,13 +1,28 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
+from datetime import datetime
+import json
+
+from django.contrib.contenttypes.models import ContentType
 from django.core.urlresolvers import reverse
+from django.test import override_settings
+from django.utils.timezone import make_aware
 
+from mock import patch
 from rest_framework.test import (
     APITestCase,
     APIClient,
 )
 
-from contest.models import RushUser
+from api.pagination import KeysetPagination
+from contest.models import (
+    Club,
+    Contact,
+    Contest,
+    ContestStyleDistances,
+    RushUser,
+    School,
+)
 
 
 class ApiTestCasesMixin(object):
@@ -40,6 +55,9 @@ class ContestTestsAPI(ApiTestCasesMixin, APITestCase):
         'contest/fixtures/contests.json',
         'contest/fixtures/clubs.json',
         'contest/fixtures/users.json',
+        'contest/fixtures/styles.json',
+        'contest/fixtures/distances.json',
+        'contest/fixtures/style_distances.json',
     ]
 
     def test_getting_info(self):
@@ -57,6 +75,72 @@ class ContestTestsAPI(ApiTestCasesMixin, APITestCase):
         self.assertEqual(response.data['results'][0]['lowest_year'], 1996)
         self.assertEqual(response.data['results'][0]['highest_year'], 2006)
 
+    def _create_contests(self, count):
+        styles = ContestStyleDistances.objects.all()
+        for i in xrange(count):
+            contact = Contact.objects.create(email='club{}@rush.pl'.format(i))
+            unit_model = Club if i % 2 else School
+            unit = unit_model.objects.create(
+                name='Unit {}'.format(i), contact=contact
+            )
+            contest = Contest.objects.create(
+                name='Contest {}'.format(i), place='Basen',
+                date=make_aware(datetime(2050, 12, 31)),
+                deadline=make_aware(datetime(2048, 11, 20)),
+                lowest_year=2000, highest_year=2005,
+                content_type=ContentType.objects.get_for_model(unit),
+                object_id=unit.pk,
+            )
+            contest.styles.set(styles)
+
+    def test_query_count(self):
+        """
+        Listing contests takes the same number of queries regardless
+        of a page size: count, contests, organizers per content type,
+        files, styles and distances.
+        """
+        self._create_contests(2)
+        url = reverse('api:contest-list')
+        self.client.get(url)
+
+        with self.assertNumQueries(7):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 5)
+
+        self._create_contests(5)
+        with self.assertNumQueries(7):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 10)
+
+        contest = response.data['results'][-1]
+        self.assertEqual(contest['organizer']['name'], 'Unit 4')
+        self.assertEqual(
+            contest['organizer']['contact']['email'], 'club4@rush.pl'
+        )
+        style = contest['styles'][0]
+        self.assertEqual(style['style']['name'], 'Dowolny')
+        self.assertEqual(
+            [distance['value'] for distance in style['distance']],
+            ['25m', '50m', '100m', '200m']
+        )
+
+    @patch.object(KeysetPagination, 'page_size', 2)
+    def test_completed_contests(self):
+        url = reverse('api:completed-contest-list')
+        response = self.client.get(url)
+        self.assertEqual(
+            [contest['pk'] for contest in response.data['results']], [1, 2]
+        )
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(
+            [contest['pk'] for contest in response.data['results']], [3]
+        )
+        self.assertIsNone(response.data['next'])
+
+        response = self.client.get(url, {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, 404)
+
 
 class ContestantTestsAPI(ApiTestCasesMixin, APITestCase):
     fixtures = [
@@ -80,6 +164,68 @@ class ContestantTestsAPI(ApiTestCasesMixin, APITestCase):
         response = self.client.get(reverse('api:contestant-list'))
         self.assertEqual(len(response.data['results']), 4)
 
+    @override_settings(API_STREAMING_CHUNK_SIZE=3)
+    def test_streaming(self):
+        RushUser.objects.create_superuser(
+            username='admin', email='test@bb.cc', password='password'
+        )
+        self.client.login(username='admin', password='password')
+        url = reverse('api:contestant-list')
+        results = self.client.get(url).data['results']
+
+        with self.assertNumQueries(6):
+            response = self.client.get(url, {'stream': '1'})
+            content = b''.join(response.streaming_content)
+
+        self.assertEqual(response['Content-Type'], 'application/json')
+        streamed = json.loads(content.decode('utf-8'))
+        self.assertEqual(len(streamed), 4)
+        self.assertEqual(
+            sorted(streamed, key=lambda item: json.dumps(item)),
+            sorted(
+                json.loads(json.dumps(results)),
+                key=lambda item: json.dumps(item)
+            )
+        )
+
+    @override_settings(API_STREAMING_CHUNK_SIZE=3)
+    def test_streaming_empty(self):
+        RushUser.objects.create_superuser(
+            username='admin', email='test@bb.cc', password='password'
+        )
+        self.client.login(username='admin', password='password')
+        response = self.client.get(
+            reverse('api:contestantscore-list'), {'stream': 'true'}
+        )
+        self.assertEqual(b''.join(response.streaming_content), b'[]')
+
+    def test_expand_and_fields(self):
+        RushUser.objects.create_superuser(
+            username='admin', email='test@bb.cc', password='password'
+        )
+        self.client.login(username='admin', password='password')
+        url = reverse('api:contestant-list')
+
+        response = self.client.get(url)
+        contestant = response.data['results'][0]
+        self.assertEqual(contestant['contest'], 1)
+        self.assertEqual(contestant['moderator'], 1)
+
+        response = self.client.get(url, {'expand': 'contest,moderator'})
+        results = response.data['results']
+        self.assertEqual(results[0]['contest']['name'], 'contest first')
+        self.assertEqual(results[0]['moderator']['pk'], 1)
+        self.assertIs(results[0]['contest'], results[1]['contest'])
+
+        response = self.client.get(
+            url, {'fields': 'pk,first_name,contest', 'expand': 'contest'}
+        )
+        contestant = response.data['results'][0]
+        self.assertEqual(
+            set(contestant), {'pk', 'first_name', 'contest'}
+        )
+        self.assertEqual(contestant['contest']['pk'], 1)
+
 
 class ClubTestsAPI(ApiTestCasesMixin, APITestCase):
     fixtures = ['contest/fixtures/clubs.json']
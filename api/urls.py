@@ -7,6 +7,10 @@ from api import views
 router = routers.DefaultRouter()
 router.register(r'contact', views.ContactViewSet)
 router.register(r'contests', views.ContestViewSet)
+router.register(
+    r'completed_contests', views.CompletedContestViewSet,
+    base_name='completed-contest'
+)
 router.register(r'clubs', views.ClubViewSet)
 router.register(r'schools', views.SchoolViewSet)
 router.register(r'contestants', views.ContestantViewSet)
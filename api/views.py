@@ -1,14 +1,22 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+import json
+
+from django.conf import settings
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets
 from rest_framework.permissions import (
     IsAuthenticatedOrReadOnly,
     IsAuthenticated
 )
+from rest_framework.utils.encoders import JSONEncoder
 
+from api.pagination import KeysetPagination
 from api.permissions import ModeratorOnly
 from api.serializers import (
+    ExpandableRelatedField,
     ContactSerializer,
     ContestSerializer,
     ClubSerializer,
@@ -34,16 +42,126 @@ from contest.models import (
 )
 
 
-class ContestViewSet(viewsets.ModelViewSet):
+class DynamicFieldsViewSetMixin(object):
+    """
+    Passes `?fields=` and `?expand=` query parameters of read requests
+    to the serializer and joins the expanded relations in the queryset.
+    """
+
+    def _get_query_param_list(self, name):
+        if self.request.method != 'GET':
+            return []
+        value = self.request.query_params.get(name, '')
+        return [item for item in value.split(',') if item]
+
+    def get_queryset(self):
+        queryset = super(DynamicFieldsViewSetMixin, self).get_queryset()
+        declared_fields = self.get_serializer_class()._declared_fields
+        related = [
+            declared_fields[name].source or name
+            for name in self._get_query_param_list('expand')
+            if isinstance(declared_fields.get(name), ExpandableRelatedField)
+        ]
+
+        return queryset.select_related(*related) if related else queryset
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self._get_query_param_list('fields'))
+        kwargs.setdefault('expand', self._get_query_param_list('expand'))
+        return super(DynamicFieldsViewSetMixin, self).get_serializer(
+            *args, **kwargs
+        )
+
+
+class StreamingListMixin(object):
+    """
+    Lets a list be requested with `?stream=1`, which returns all objects,
+    without pagination, as a JSON array written while the queryset is read
+    in chunks of `API_STREAMING_CHUNK_SIZE` objects. Objects are streamed in
+    the primary key order.
+    """
+    stream_query_param = 'stream'
+
+    def _get_chunks(self, queryset):
+        """
+        Yields lists of objects, seeking chunks by a primary key, so
+        prefetched relations still work and only one chunk is kept
+        in memory.
+        """
+        queryset = queryset.order_by('pk')
+        chunk_size = settings.API_STREAMING_CHUNK_SIZE
+        last_pk = None
+        while True:
+            chunk = queryset if last_pk is None else queryset.filter(
+                pk__gt=last_pk
+            )
+            chunk = list(chunk[:chunk_size])
+            if not chunk:
+                return
+            yield chunk
+            if len(chunk) < chunk_size:
+                return
+            last_pk = chunk[-1].pk
+
+    def _stream(self, queryset):
+        separator = b'['
+        for chunk in self._get_chunks(queryset):
+            for item in self.get_serializer(chunk, many=True).data:
+                yield separator + json.dumps(
+                    item, cls=JSONEncoder, ensure_ascii=False
+                ).encode('utf-8')
+                separator = b','
+        yield b'[]' if separator == b'[' else b']'
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get(self.stream_query_param) not in (
+            '1', 'true'
+        ):
+            return super(StreamingListMixin, self).list(
+                request, *args, **kwargs
+            )
+        queryset = self.filter_queryset(self.get_queryset())
+        # The stream is read after the view returns, so the database chosen
+        # by routers for the view is fixed up front.
+        return StreamingHttpResponse(
+            self._stream(queryset.using(queryset.db)),
+            content_type='application/json'
+        )
+
+
+class ContestViewSet(StreamingListMixin, viewsets.ModelViewSet):
     """
     API endpoint that allow to view Contests.
     """
     permission_classes = (IsAuthenticatedOrReadOnly,)
-    queryset = Contest.objects.all().order_by('date')
+    queryset = Contest.objects.prefetch_generic(
+        'organizer', select_related=('contact',)
+    ).prefetch_related(
+        'contestfiles_set',
+        Prefetch(
+            'styles',
+            queryset=ContestStyleDistances.objects.prefetch_related(
+                'distances'
+            )
+        ),
+    ).order_by('date')
+    serializer_class = ContestSerializer
+
+
+class CompletedContestViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint that allow to browse completed Contests, the latest first.
+    """
+    permission_classes = (IsAuthenticatedOrReadOnly,)
+    queryset = ContestViewSet.queryset
     serializer_class = ContestSerializer
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        return super(CompletedContestViewSet, self).get_queryset().completed()
 
 
-class ContactViewSet(viewsets.ModelViewSet):
+class ContactViewSet(StreamingListMixin, viewsets.ModelViewSet):
     """
     API endpoint that allow to view Clubs.
     """
@@ -51,44 +169,50 @@ class ContactViewSet(viewsets.ModelViewSet):
     serializer_class = ContactSerializer
 
 
-class ClubViewSet(viewsets.ModelViewSet):
+class ClubViewSet(StreamingListMixin, viewsets.ModelViewSet):
     """
     API endpoint that allow to view Clubs.
     """
-    queryset = Club.objects.all()
+    queryset = Club.objects.select_related('contact')
     serializer_class = ClubSerializer
 
 
-class SchoolViewSet(viewsets.ModelViewSet):
+class SchoolViewSet(StreamingListMixin, viewsets.ModelViewSet):
     """
     API endpoint that allow to view Clubs.
     """
-    queryset = School.objects.all()
+    queryset = School.objects.select_related('contact')
     serializer_class = SchoolSerializer
 
 
-class ContestantViewSet(viewsets.ModelViewSet):
+class ContestantViewSet(
+    StreamingListMixin, DynamicFieldsViewSetMixin, viewsets.ModelViewSet
+):
     """
     API endpoint that allow to view Contestants.
     """
     permission_classes = (IsAuthenticated, ModeratorOnly,)
-    queryset = Contestant.objects.all().order_by('contest')
+    queryset = Contestant.objects.prefetch_related(
+        'contestantscore_set'
+    ).order_by('contest')
     serializer_class = ContestantSerializer
 
 
-class RushUserViewSet(viewsets.ModelViewSet):
+class RushUserViewSet(StreamingListMixin, viewsets.ModelViewSet):
     """
     API endpoint that allow to view RushUsers.
     """
-    queryset = RushUser.objects.all().order_by('date_joined')
+    queryset = RushUser.objects.prefetch_generic(
+        'unit', select_related=('contact',)
+    ).order_by('date_joined')
     serializer_class = RushUserSerializer
 
 
-class ContestantScoreViewSet(viewsets.ModelViewSet):
+class ContestantScoreViewSet(StreamingListMixin, viewsets.ModelViewSet):
     """
     API endpoint that allow to view Contestants' scores.
     """
-    queryset = ContestantScore.objects.all()
+    queryset = ContestantScore.objects.select_related('contestant')
     serializer_class = ContestantScoreSerializer
 
 
@@ -15,22 +15,27 @@ from contest.models import (
     Distance,
     ContestantScore,
     ContestStyleDistances,
+    ContestResult,
+    QueuedEmail,
 )
 from contest.utils import admin_utils
 
 
 class UnitAdminMixin(object):
 
+    class Media:
+        js = ('js/unit_autocomplete.js',)
+
     def save_model(self, request, obj, form, change):
         """
         Handles saving an expected school/club based on chosen option
-        in pre-filled select.
+        in the unit autocomplete.
         """
-        object_id, content_type = admin_utils.get_unit_id_and_type(
-            request.POST['unit']
-        )
-        obj.object_id = object_id
-        obj.content_type = content_type
+        unit = request.POST.get('unit')
+        if unit:
+            obj.object_id, obj.content_type = (
+                admin_utils.get_unit_id_and_type(unit)
+            )
 
         obj.save()
 
@@ -43,11 +48,12 @@ class RushUserAdmin(UnitAdminMixin, admin.ModelAdmin):
         """
         Creating an account (set login, temporary password, active status).
         """
-        for user in queryset:
-            if user.is_active:
-                continue
-            user.activate()
-            user.send_reset_password_email(request, True)
+        users = RushUser.objects.activate(
+            queryset.filter(is_active=False).values_list('pk', flat=True)
+        )
+        QueuedEmail.objects.enqueue_many(
+            user.get_reset_password_email(request, True) for user in users
+        )
 
     create.short_description = 'Stwórz konto'
 
@@ -100,6 +106,16 @@ class ContestantAdmin(UnitAdminMixin, admin.ModelAdmin):
     inlines = [ContestantScoreInline]
 
 
+class QueuedEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'created', 'send_after', 'sent', 'attempts')
+    list_filter = ('sent',)
+
+
+class ContestResultAdmin(admin.ModelAdmin):
+    list_display = ('contest', 'style', 'distance', 'place', 'contestant')
+    list_filter = ('contest',)
+
+
 admin.site.register(RushUser, RushUserAdmin)
 admin.site.register(Contestant, ContestantAdmin)
 admin.site.register(Contest, ContestAdmin)
@@ -110,3 +126,5 @@ admin.site.register(Style)
 admin.site.register(Distance)
 admin.site.register(ContestantScore)
 admin.site.register(ContestStyleDistances)
+admin.site.register(ContestResult, ContestResultAdmin)
+admin.site.register(QueuedEmail, QueuedEmailAdmin)
@@ -1,5 +1,71 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
 
 
 class ContestConfig(AppConfig):
     name = 'contest'
+
+    def ready(self):
+        from contest.catalog import invalidate_catalog
+        from contest.fragments import invalidate_home_fragments
+        from contest.models import (
+            Club,
+            Contest,
+            ContestStyleDistances,
+            Contestant,
+            ContestantScore,
+            Distance,
+            RushUser,
+            School,
+            Style,
+            clear_unit_name,
+            count_contestant,
+            count_score,
+            invalidate_user_roles,
+            propagate_unit_name,
+            track_deletion,
+            uncount_contestant,
+            uncount_score,
+            untrack_contest,
+            update_contest_style_signature,
+            update_unit_name,
+        )
+        from rush.db import close_unusable_connections
+
+        request_started.connect(close_unusable_connections)
+
+        for model in (Style, Distance):
+            post_save.connect(invalidate_catalog, sender=model)
+            post_delete.connect(invalidate_catalog, sender=model)
+
+        post_save.connect(invalidate_home_fragments, sender=Contest)
+        post_delete.connect(invalidate_home_fragments, sender=Contest)
+
+        pre_delete.connect(track_deletion, sender=Contest)
+        post_delete.connect(untrack_contest, sender=Contest)
+        pre_delete.connect(track_deletion, sender=Contestant)
+        post_save.connect(count_contestant, sender=Contestant)
+        post_delete.connect(uncount_contestant, sender=Contestant)
+        post_save.connect(count_score, sender=ContestantScore)
+        post_delete.connect(uncount_score, sender=ContestantScore)
+
+        m2m_changed.connect(
+            update_contest_style_signature,
+            sender=ContestStyleDistances.distances.through
+        )
+        for through in (RushUser.groups.through,
+                        RushUser.user_permissions.through):
+            m2m_changed.connect(invalidate_user_roles, sender=through)
+
+        for model in (RushUser, Contest):
+            pre_save.connect(update_unit_name, sender=model)
+        for model in (Club, School):
+            post_save.connect(propagate_unit_name, sender=model)
+            post_delete.connect(clear_unit_name, sender=model)
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+from collections import OrderedDict
+import re
+import resource
+import threading
+import time
+
+from django.core.urlresolvers import reverse
+from django.db import (
+    close_old_connections,
+    connection,
+    connections,
+)
+from django.test import (
+    Client,
+    override_settings,
+)
+from django.utils import timezone
+
+from contest.catalog import catalog
+from contest.models import Contest
+from contest.synthetic import (
+    EMAIL_DOMAIN,
+    PASSWORD,
+)
+
+_QUERIES_RE = re.compile(r'sql;dur=[\d.]+;desc="(\d+) queries"')
+
+
+def percentile(values, percent):
+    """
+    Returns a nearest-rank percentile of given values.
+    """
+    values = sorted(values)
+    index = max(int(round(percent / 100.0 * len(values))) - 1, 0)
+    return values[index]
+
+
+def get_max_rss():
+    """
+    Returns peak resident set size of this process, in kilobytes.
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def get_context(formset_size):
+    """
+    Returns data of synthetic records used by scenarios, or None if there
+    aren't any.
+    """
+    contest = Contest.objects.filter(
+        deadline__gt=timezone.now(),
+        created_by__email__endswith='@' + EMAIL_DOMAIN, styles__isnull=False
+    ).select_related('created_by').order_by('pk').first()
+    if contest is None:
+        return None
+
+    style = contest.styles.select_related('style').first()
+    distance = style.distances.first()
+    styles = '{},{},01:00.00'.format(style.style.name, distance.value)
+    data = {
+        'form-INITIAL_FORMS': '0',
+        'form-MAX_NUM_FORMS': '1000',
+        'form-MIN_NUM_FORMS': '0',
+        'form-TOTAL_FORMS': str(formset_size),
+    }
+    for i in xrange(formset_size):
+        data.update({
+            'form-{}-first_name'.format(i): 'Jan',
+            'form-{}-last_name'.format(i): 'Kowalski',
+            'form-{}-gender'.format(i): 'M',
+            'form-{}-year_of_birth'.format(i): str(contest.lowest_year),
+            'form-{}-school'.format(i): 'P',
+            'form-{}-styles'.format(i): styles,
+        })
+    return {
+        'username': contest.created_by.username,
+        'contest_id': contest.pk,
+        'formset': data,
+    }
+
+
+def _home(client, context):
+    return client.get(reverse('contest:home'))
+
+
+def _login(client, context):
+    return client.post(reverse('contest:login'), {
+        'username': context['username'], 'password': PASSWORD,
+    })
+
+
+def _contestant_add(client, context):
+    return client.post(
+        reverse(
+            'contest:contestant-add',
+            kwargs={'contest_id': context['contest_id']}
+        ),
+        context['formset']
+    )
+
+
+def _api_contests(client, context):
+    return client.get(reverse('api:contest-list'))
+
+
+def _api_contestants(client, context):
+    return client.get(reverse('api:contestant-list'))
+
+
+# Name: (request, whether a client has to be logged in).
+SCENARIOS = OrderedDict([
+    ('home', (_home, False)),
+    ('login', (_login, False)),
+    ('contestant_add', (_contestant_add, True)),
+    ('api_contests', (_api_contests, False)),
+    ('api_contestants', (_api_contestants, True)),
+])
+
+
+def _run_worker(scenario, context, count, samples, errors,
+                close_connections=False):
+    request, logged_in = SCENARIOS[scenario]
+    client = Client()
+    if logged_in:
+        client.login(username=context['username'], password=PASSWORD)
+    for _ in xrange(count):
+        start = time.time()
+        response = request(client, context)
+        duration = (time.time() - start) * 1000
+        if close_connections:
+            # The test client doesn't close connections after a request,
+            # like a server does, so reconnects wouldn't be measured.
+            close_old_connections()
+        if response.status_code >= 400:
+            errors.append(response.status_code)
+        match = _QUERIES_RE.search(response.get('Server-Timing', ''))
+        samples.append((duration, int(match.group(1)) if match else None))
+
+
+def _run_thread(*args):
+    try:
+        _run_worker(*args)
+    finally:
+        connection.close()
+
+
+def run_scenario(scenario, context, requests, concurrency=1,
+                 close_connections=False):
+    """
+    Sends `requests` requests of given scenario from `concurrency` threads
+    and returns latency percentiles in milliseconds, queries per request
+    and peak RSS. A single client runs in the calling thread. With
+    `close_connections`, connections are closed after requests as
+    `CONN_MAX_AGE` says.
+    """
+    samples = []
+    errors = []
+    start = time.time()
+    if concurrency == 1:
+        _run_worker(
+            scenario, context, requests, samples, errors, close_connections
+        )
+    else:
+        threads = [
+            threading.Thread(target=_run_thread, args=(
+                scenario, context, requests // concurrency +
+                (1 if i < requests % concurrency else 0), samples, errors,
+                close_connections
+            )) for i in xrange(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.time() - start
+
+    durations = [duration for duration, _ in samples]
+    queries = [count for _, count in samples if count is not None]
+    return OrderedDict([
+        ('requests', len(samples)),
+        ('errors', len(errors)),
+        ('throughput', round(len(samples) / elapsed, 1) if elapsed else 0),
+        ('p50', round(percentile(durations, 50), 1)),
+        ('p95', round(percentile(durations, 95), 1)),
+        ('p99', round(percentile(durations, 99), 1)),
+        ('queries', max(queries) if queries else None),
+        ('max_rss', get_max_rss()),
+    ])
+
+
+def _set_conn_max_age(conn_max_age):
+    """
+    Sets `CONN_MAX_AGE` of all databases, returning previous values. It's
+    applied to connections opened afterwards.
+    """
+    previous = {}
+    for alias in connections:
+        settings_dict = connections[alias].settings_dict
+        previous[alias] = settings_dict['CONN_MAX_AGE']
+        settings_dict['CONN_MAX_AGE'] = conn_max_age[alias]
+    return previous
+
+
+def run(context, scenarios, requests, concurrency=1, conn_max_age=None):
+    """
+    Runs given scenarios with query profiling enabled and returns their
+    results by a name. Connections are closed between requests only if
+    `conn_max_age` is given, which overrides `CONN_MAX_AGE` of databases.
+    """
+    catalog.invalidate()
+    close_connections = conn_max_age is not None
+    if close_connections:
+        previous = _set_conn_max_age(
+            {alias: conn_max_age for alias in connections}
+        )
+        connections.close_all()
+    try:
+        with override_settings(
+            QUERY_PROFILING=True, ALLOWED_HOSTS=['testserver']
+        ):
+            return OrderedDict(
+                (scenario, run_scenario(
+                    scenario, context, requests, concurrency,
+                    close_connections
+                )) for scenario in scenarios
+            )
+    finally:
+        if close_connections:
+            _set_conn_max_age(previous)
+
+
+def compare(results, baseline, tolerance):
+    """
+    Returns descriptions of p95 latencies or query counts which grew by
+    more than `tolerance` percent compared to the baseline.
+    """
+    regressions = []
+    for scenario, result in results.items():
+        for metric in ('p95', 'queries'):
+            old = baseline.get(scenario, {}).get(metric)
+            new = result[metric]
+            if old is None or new is None:
+                continue
+            if new > old * (1 + tolerance / 100.0):
+                regressions.append('{} {}: {} -> {}'.format(
+                    scenario, metric, old, new
+                ))
+    return regressions
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.utils.encoding import force_bytes
+
+NAMESPACE_VERSION_KEY = 'namespace:{}'
+# Memcached refuses longer keys and ones with whitespace or control chars.
+MAX_KEY_LENGTH = 250
+
+
+def make_key(key, key_prefix, version):
+    """
+    Builds a full cache key, `KEY_FUNCTION` of every cache. Keys which
+    memcached wouldn't accept are replaced by their hash.
+    """
+    full_key = '{}:{}:{}'.format(key_prefix, version, key)
+    if len(force_bytes(full_key)) > MAX_KEY_LENGTH or any(
+        ord(char) < 33 or ord(char) == 127 for char in full_key
+    ):
+        full_key = '{}:{}:hash:{}'.format(
+            key_prefix, version, hashlib.md5(force_bytes(key)).hexdigest()
+        )
+    return full_key
+
+
+def _get_namespace_version(namespace):
+    """
+    Returns current version of a namespace. A new version starts from
+    the current time, so values cached before the version itself got
+    evicted aren't reachable again.
+    """
+    key = NAMESPACE_VERSION_KEY.format(namespace)
+    version = cache.get(key)
+    if version is None:
+        version = int(time.time())
+        # Another worker could have added a version in the meantime.
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def get_key(namespace, *parts):
+    """
+    Returns a key of a cached value, e.g. `home:v3:fragments`. Keys of
+    a namespace change after `invalidate_namespace`, so all its values are
+    dropped at once.
+    """
+    return '{}:v{}:{}'.format(
+        namespace, _get_namespace_version(namespace),
+        ':'.join('{}'.format(part) for part in parts)
+    )
+
+
+def invalidate_namespace(namespace):
+    """
+    Makes all values cached in a namespace unreachable. They are evicted by
+    the cache later.
+    """
+    try:
+        cache.incr(NAMESPACE_VERSION_KEY.format(namespace))
+    except ValueError:
+        # Nothing has been cached in the namespace yet.
+        pass
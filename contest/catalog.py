@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from contest.models import (
+    Distance,
+    Style,
+)
+
+
+class Catalog(object):
+    """
+    In-process cache of `Style` and `Distance` lookup tables.
+
+    Both tables are loaded on first use and reloaded after any of their
+    rows is saved or deleted in this process.
+    """
+
+    def __init__(self):
+        self._tables = None
+
+    def _load(self):
+        styles = list(Style.objects.all())
+        distances = list(Distance.objects.all())
+
+        return {
+            'styles': {style.name: style for style in styles},
+            'distances': {distance.value: distance for distance in distances},
+            'pks': {
+                Style: {style.pk: style for style in styles},
+                Distance: {distance.pk: distance for distance in distances},
+            },
+        }
+
+    @property
+    def tables(self):
+        tables = self._tables
+        if tables is None:
+            tables = self._tables = self._load()
+        return tables
+
+    def invalidate(self):
+        """
+        Drops loaded tables, so they're read again on the next lookup.
+        """
+        self._tables = None
+
+    def get_style(self, name):
+        """
+        Returns a style with given name.
+        """
+        try:
+            return self.tables['styles'][name]
+        except KeyError:
+            raise Style.DoesNotExist(
+                'Style "{}" does not exist.'.format(name)
+            )
+
+    def get_distance(self, value):
+        """
+        Returns a distance with given value, e.g. '50m'.
+        """
+        try:
+            return self.tables['distances'][value]
+        except KeyError:
+            raise Distance.DoesNotExist(
+                'Distance "{}" does not exist.'.format(value)
+            )
+
+    def get(self, model, pk):
+        """
+        Returns a `Style` or a `Distance` with given primary key.
+        """
+        try:
+            return self.tables['pks'][model][pk]
+        except KeyError:
+            raise model.DoesNotExist(
+                '{} with pk {} does not exist.'.format(model.__name__, pk)
+            )
+
+
+def invalidate_catalog(sender, **kwargs):
+    """
+    Signal receiver invalidating the catalog on changes of its tables.
+    """
+    catalog.invalidate()
+
+catalog = Catalog()
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+from collections import OrderedDict
+import re
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections
+from django.utils import timezone
+
+from contest.models import (
+    Contest,
+    Contestant,
+    RushUser,
+)
+from contest.synthetic import EMAIL_DOMAIN
+
+# Full scans of a table or of one of its indexes, e.g. `SCAN TABLE t`,
+# `SCAN t USING COVERING INDEX i`. Only `SEARCH` steps use an index lookup.
+_SQLITE_SCAN_RE = re.compile(r'^SCAN (?:TABLE )?(?!CONSTANT ROW)(\w+)')
+# Access types of MySQL full scans of a table and of an index.
+_MYSQL_SCAN_TYPES = ('ALL', 'index')
+
+
+def get_context():
+    """
+    Returns a synthetic user with a contest to fill parameters of queries,
+    or None if there isn't any.
+    """
+    contest = Contest.objects.filter(
+        created_by__email__endswith='@' + EMAIL_DOMAIN
+    ).select_related('created_by').order_by('pk').first()
+    if contest is None:
+        return None
+    return {'user': contest.created_by, 'contest': contest}
+
+
+def _home_upcoming(context):
+    return Contest.objects.filter(date__gte=timezone.now()).order_by('date')
+
+
+def _home_completed(context):
+    return Contest.objects.completed()[:10]
+
+
+def _notification_recipients(context):
+    return RushUser.objects.filter(
+        notifications=True, is_active=True
+    ).exclude(
+        email=context['user'].email
+    ).values_list('email', flat=True)
+
+
+def _inactive_accounts(context):
+    return RushUser.objects.filter(is_active=False).order_by('pk')[:50]
+
+
+def _contestant_list(context):
+    return Contestant.objects.filter(
+        contest=context['contest'], moderator=context['user']
+    )
+
+
+def _unit_users(context):
+    return RushUser.objects.filter(
+        content_type=context['user'].content_type,
+        object_id=context['user'].object_id
+    )
+
+
+def _unit_contests(context):
+    return Contest.objects.filter(
+        content_type=ContentType.objects.get_for_model(
+            context['contest'].organizer
+        ),
+        object_id=context['contest'].object_id
+    )
+
+
+# Name: function returning a queryset of the query.
+QUERIES = OrderedDict([
+    ('home_upcoming', _home_upcoming),
+    ('home_completed', _home_completed),
+    ('notification_recipients', _notification_recipients),
+    ('inactive_accounts', _inactive_accounts),
+    ('contestant_list', _contestant_list),
+    ('unit_users', _unit_users),
+    ('unit_contests', _unit_contests),
+])
+
+
+def _explain_sqlite(cursor, sql, params):
+    cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+    plan = []
+    for row in cursor.fetchall():
+        detail = row[-1]
+        match = _SQLITE_SCAN_RE.match(detail)
+        plan.append((detail, match.group(1) if match else None))
+    return plan
+
+
+def _explain_mysql(cursor, sql, params):
+    cursor.execute('EXPLAIN ' + sql, params)
+    columns = [column[0] for column in cursor.description]
+    plan = []
+    for row in cursor.fetchall():
+        row = dict(zip(columns, row))
+        plan.append((
+            '{table}: {type}, key {key}, rows {rows}, {Extra}'.format(**row),
+            row['table'] if row['type'] in _MYSQL_SCAN_TYPES else None
+        ))
+    return plan
+
+
+_EXPLAINERS = {
+    'sqlite': _explain_sqlite,
+    'mysql': _explain_mysql,
+}
+
+
+def explain(queryset):
+    """
+    Returns `(description, fully scanned table or None)` pairs of steps of
+    a query plan.
+    """
+    connection = connections[queryset.db]
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        return _EXPLAINERS[connection.vendor](cursor, sql, params)
+
+
+def is_supported(alias):
+    return connections[alias].vendor in _EXPLAINERS
+
+
+def run(context, names=None):
+    """
+    Explains given hot queries, all by default. Returns their plans by
+    a name.
+    """
+    return OrderedDict(
+        (name, explain(QUERIES[name](context)))
+        for name in names or QUERIES
+    )
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+from tempfile import TemporaryFile
+import csv
+
+import xlsxwriter
+
+from contest.catalog import catalog
+from contest.models import (
+    ContestantScore,
+    Distance,
+    Style,
+)
+from contest.utils import format_time_result
+
+START_LIST_HEADER = (
+    'Styl', 'Dystans', 'Nazwisko', 'Imię', 'Płeć', 'Rok urodzenia',
+    'Rodzaj szkoły', 'Czas zgłoszeniowy',
+)
+
+
+class Echo(object):
+    """
+    File-like object which returns written value instead of storing it.
+    """
+
+    def write(self, value):
+        return value
+
+
+def get_start_list_rows(contest):
+    """
+    Yields contest's entries, one per contestant's style and distance.
+    """
+    scores = ContestantScore.objects.filter(
+        contestant__contest=contest
+    ).select_related('contestant').order_by(
+        'style', 'distance', 'time_result', 'contestant__last_name'
+    )
+    for score in scores.iterator():
+        contestant = score.contestant
+        yield (
+            catalog.get(Style, score.style_id).name,
+            catalog.get(Distance, score.distance_id).value,
+            contestant.last_name,
+            contestant.first_name,
+            contestant.get_gender_display(),
+            contestant.year_of_birth,
+            contestant.get_school_display() or '',
+            (
+                format_time_result(score.time_result)
+                if score.time_result is not None else ''
+            ),
+        )
+
+
+def stream_csv(rows):
+    """
+    Yields rows encoded as CSV lines.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow([cell.encode('utf-8') for cell in START_LIST_HEADER])
+    for row in rows:
+        yield writer.writerow([unicode(cell).encode('utf-8') for cell in row])
+
+
+def write_xlsx(rows):
+    """
+    Writes rows into a temporary XLSX file and returns it rewound.
+    """
+    output = TemporaryFile()
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    worksheet = workbook.add_worksheet('Lista startowa')
+    worksheet.write_row(0, 0, START_LIST_HEADER)
+    for row_number, row in enumerate(rows, 1):
+        worksheet.write_row(row_number, 0, row)
+    workbook.close()
+    output.seek(0)
+    return output
@@ -2,6 +2,7 @@
 from __future__ import unicode_literals
 from collections import OrderedDict
 from datetime import datetime
+import csv
 import uuid
 
 from django import forms
@@ -14,22 +15,24 @@ from django.contrib.auth.forms import (
     SetPasswordForm,
 )
 from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ObjectDoesNotExist
 from django.core.validators import RegexValidator
-from django.db.models.aggregates import Count
+from django.db import transaction
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
+from contest.catalog import catalog
 from contest.models import (
     Club,
     Contest,
     Contestant,
     ContestFiles,
+    ContestResult,
     RushUser,
     School,
-    Style,
-    Distance,
     ContestStyleDistances,
 )
+from contest.utils import parse_time_result
 
 INDIVIDUAL_CONTESTANTS_GROUP = Group.objects.get(name='Individual contestants')
 YEARS_RANGE = 41
@@ -289,12 +292,19 @@ class ContestantForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         self.contest = kwargs.pop('contest_id')
         self.user = kwargs.pop('user')
+        self.contest_instance = kwargs.pop('contest', None)
+        is_individual_contestant = kwargs.pop(
+            'is_individual_contestant', None
+        )
         super(ContestantForm, self).__init__(*args, **kwargs)
 
-        if self.user.unit:
-            self.fields['organization'].initial = self.user.unit
+        if is_individual_contestant is None:
+            is_individual_contestant = self.user.is_individual_contestant
+
+        if self.user.unit_name:
+            self.fields['organization'].initial = self.user.unit_name
             self.fields['organization'].widget.attrs['readonly'] = True
-        if self.user.is_individual_contestant:
+        if is_individual_contestant:
             self.fields['first_name'].initial = self.user.first_name
             self.fields['first_name'].widget.attrs['readonly'] = True
             self.fields['last_name'].initial = self.user.last_name
@@ -306,7 +316,9 @@ class ContestantForm(forms.ModelForm):
 
     def clean_year_of_birth(self):
         year_of_birth = int(self.cleaned_data.get('year_of_birth'))
-        contest = Contest.objects.get(pk=self.contest)
+        contest = (
+            self.contest_instance or Contest.objects.get(pk=self.contest)
+        )
         if contest.lowest_year <= year_of_birth <= contest.highest_year:
             return year_of_birth
         raise forms.ValidationError(
@@ -367,8 +379,8 @@ class ContestForm(forms.ModelForm):
         self.fields['description'].widget.attrs = {
             'class': 'materialize-textarea'
         }
-        self.fields['organization'].initial = self.user.unit
-        if self.user.unit:
+        self.fields['organization'].initial = self.user.unit_name
+        if self.user.unit_name:
             self.fields['organization'].widget.attrs['readonly'] = True
         self.fields['lowest_year'] = forms.ChoiceField(choices=year_dropdown)
         self.fields['highest_year'] = forms.ChoiceField(
@@ -404,40 +416,21 @@ class ContestForm(forms.ModelForm):
 
     @staticmethod
     def get_styles_array(raw_styles):
-        shortcuts = {
-            'D': 'Dowolny', 'G': 'Grzbietowy', 'K': 'Klasyczny',
-            'M': 'Motylkowy', 'Z': 'Zmienny'
-        }
-        styles_counter = OrderedDict(
-            [('D', 0), ('G', 0), ('K', 0), ('M', 0), ('Z', 0)]
-        )
-        distances = []
-        styles = []
+        shortcuts = OrderedDict([
+            ('D', 'Dowolny'), ('G', 'Grzbietowy'), ('K', 'Klasyczny'),
+            ('M', 'Motylkowy'), ('Z', 'Zmienny'),
+        ])
+        distances = OrderedDict((shortcut, []) for shortcut in shortcuts)
         for style in raw_styles:
-            styles_counter[style[0]] += 1
-            distances.append(
-                Distance.objects.get(value=style[1:] + 'm')
+            distances[style[0]].append(
+                catalog.get_distance(style[1:] + 'm')
             )
-        for style, value in styles_counter.items():
-            if value == 0:
-                continue
-            contest_style = ContestStyleDistances.objects.annotate(
-                c=Count('distances')
-            ).filter(
-                c=value, style__name=shortcuts[style],
-                distances__in=distances[:value]
-            )
-            if not contest_style:
-                contest_style = ContestStyleDistances.objects.create(
-                    style=Style.objects.get(name=shortcuts[style])
-                )
-                contest_style.distances = distances[:value]
-                contest_style.save()
-                styles.append(contest_style)
-            else:
-                styles.append(contest_style[0])
-            del distances[:value]
-        return styles
+
+        return ContestStyleDistances.objects.get_or_create_many([
+            (catalog.get_style(shortcuts[style]), style_distances)
+            for style, style_distances in distances.items()
+            if style_distances
+        ])
 
     def clean_highest_year(self):
         lowest_year = self.cleaned_data.get('lowest_year')
@@ -505,7 +498,7 @@ class ContestForm(forms.ModelForm):
         contest = super(ContestForm, self).save(commit=False)
 
         contest.created_by = self.user
-        contest.content_type = self.user.content_type
+        contest.content_type_id = self.user.content_type_id
         contest.object_id = self.user.object_id
         if commit:
             contest.save()
@@ -538,3 +531,76 @@ class ContestResultsForm(forms.ModelForm):
     class Meta:
         model = Contest
         fields = ['results']
+
+
+class ContestResultsImportForm(forms.Form):
+    """
+    Form for importing contest's results from a CSV file.
+    """
+    results_file = forms.FileField(
+        label='Plik z wynikami (CSV)',
+        help_text=(
+            'Kolumny: id zawodnika, styl, dystans, miejsce, czas (mm:ss.cc).'
+        ),
+        widget=forms.FileInput(attrs={'class': 'btn waves-effect waves-light'})
+    )
+
+    def __init__(self, *args, **kwargs):
+        self.contest = kwargs.pop('contest')
+        super(ContestResultsImportForm, self).__init__(*args, **kwargs)
+
+    def _parse_row(self, row, contestant_ids):
+        contestant_id, style, distance, place, time = (
+            cell.decode('utf-8').strip() for cell in row
+        )
+        if int(contestant_id) not in contestant_ids:
+            raise ValueError('zawodnik nie bierze udziału w zawodach')
+
+        return ContestResult(
+            contest=self.contest,
+            contestant_id=int(contestant_id),
+            style=catalog.get_style(style),
+            distance=catalog.get_distance(distance),
+            place=int(place),
+            time_result=parse_time_result(time) if time else None,
+        )
+
+    def clean_results_file(self):
+        results_file = self.cleaned_data['results_file']
+        contestant_ids = set(
+            self.contest.contestant_set.values_list('pk', flat=True)
+        )
+
+        results = []
+        errors = []
+        seen = set()
+        for line, row in enumerate(csv.reader(results_file), 1):
+            if not row:
+                continue
+            try:
+                result = self._parse_row(row, contestant_ids)
+            except (ValueError, TypeError, ObjectDoesNotExist) as e:
+                errors.append('Wiersz {}: {}'.format(line, e))
+                continue
+            key = (result.contestant_id, result.style_id, result.distance_id)
+            if key in seen:
+                errors.append(
+                    'Wiersz {}: powtórzony wynik zawodnika w tej '
+                    'konkurencji'.format(line)
+                )
+            seen.add(key)
+            results.append(result)
+
+        if errors:
+            raise forms.ValidationError(errors)
+        return results
+
+    def save(self):
+        """
+        Replaces contest's results with imported ones.
+        """
+        with transaction.atomic():
+            ContestResult.objects.filter(contest=self.contest).delete()
+            ContestResult.objects.bulk_create(
+                self.cleaned_data['results_file']
+            )
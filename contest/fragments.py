@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+from math import ceil
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from contest.cache import (
+    get_key,
+    invalidate_namespace,
+)
+from contest.models import Contest
+
+HOME_NAMESPACE = 'home'
+
+
+def _render(template_name, contest):
+    return render_to_string(
+        'contest/home/{}.html'.format(template_name), {'contest': contest}
+    )
+
+
+def _get_timeout(contests, now):
+    """
+    Returns seconds left to the nearest deadline or date of given contests,
+    as that's when rendered fragments change.
+    """
+    boundaries = [
+        boundary for contest in contests
+        for boundary in (contest.deadline, contest.date) if boundary > now
+    ]
+    if not boundaries:
+        return settings.HOME_CACHE_TIMEOUT
+    seconds = (min(boundaries) - now).total_seconds()
+    return min(settings.HOME_CACHE_TIMEOUT, int(ceil(seconds)))
+
+
+def get_completed_items(contests):
+    """
+    Returns completed contests with their rendered fragments.
+    """
+    return [
+        {
+            'contest': contest,
+            'name': _render('completed_contest_name', contest),
+            'actions': _render('completed_contest_actions', contest),
+        } for contest in contests
+    ]
+
+
+def get_manageable(user, contests):
+    """
+    Returns ids of contests which results can be added by the user.
+    """
+    if not user.is_authenticated() or not contests:
+        return set()
+    is_moderator = user.is_moderator
+    return {
+        contest.pk for contest in contests
+        if contest.created_by_id == user.pk or (
+            is_moderator and
+            user.content_type_id == contest.content_type_id and
+            user.object_id == contest.object_id
+        )
+    }
+
+
+def get_home_fragments():
+    """
+    Returns upcoming and completed contests with their rendered fragments,
+    cached until one of contests changes or crosses its deadline or date.
+    """
+    key = get_key(HOME_NAMESPACE, 'fragments')
+    fragments = cache.get(key)
+    if fragments is not None:
+        return fragments
+
+    # Fragments outlive replication lag, so they're built from the default
+    # database, or a replica could put a just changed contest back.
+    contests = Contest.objects.using(DEFAULT_DB_ALIAS)
+    now = timezone.now()
+    upcoming = list(contests.filter(date__gte=now).order_by('date'))
+    completed, next_cursor = contests.completed().seek(
+        None, settings.COMPLETED_CONTESTS_PAGE_SIZE
+    )
+    fragments = {
+        'upcoming': [
+            {'contest': contest, 'html': _render('upcoming_contest', contest)}
+            for contest in upcoming
+        ],
+        'completed': get_completed_items(completed),
+        'next_cursor': next_cursor,
+    }
+    cache.set(key, fragments, _get_timeout(upcoming, now))
+    return fragments
+
+
+def invalidate_home_fragments(sender, **kwargs):
+    """
+    Signal receiver dropping cached fragments on contest's changes.
+    """
+    invalidate_namespace(HOME_NAMESPACE)
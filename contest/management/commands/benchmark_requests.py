@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import json
+import os
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+
+from contest import benchmarks
+from contest.synthetic import SyntheticData
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures latency, queries and memory of the busiest pages on '
+        'synthetic data, optionally comparing them with a saved baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=100,
+            help='Number of requests of every scenario.'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=1,
+            help='Number of clients sending requests at once.'
+        )
+        parser.add_argument(
+            '--scenario', action='append', dest='scenarios',
+            choices=list(benchmarks.SCENARIOS),
+            help='Scenario to run, all of them by default.'
+        )
+        parser.add_argument(
+            '--conn-max-age', type=int,
+            help=(
+                'Closes connections between requests after that many '
+                'seconds, like a server does; 0 opens a connection per '
+                'request. By default connections are never closed.'
+            )
+        )
+        parser.add_argument(
+            '--formset-size', type=int, default=50,
+            help='Number of contestants added by a single request.'
+        )
+        parser.add_argument(
+            '--clubs', type=int, default=2000,
+            help='Number of synthetic clubs, if there is no data yet.'
+        )
+        parser.add_argument(
+            '--contests', type=int, default=300,
+            help='Number of synthetic contests, if there is no data yet.'
+        )
+        parser.add_argument(
+            '--contestants', type=int, default=100000,
+            help='Number of synthetic contestants, if there is no data yet.'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Seed of the synthetic data generator.'
+        )
+        parser.add_argument(
+            '--baseline', default='benchmark_baseline.json',
+            help='Path of a JSON file with results to compare with.'
+        )
+        parser.add_argument(
+            '--save-baseline', action='store_true',
+            help='Saves results as the new baseline.'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=20,
+            help='Allowed growth of p95 latency and queries, in percent.'
+        )
+
+    def _get_context(self, options):
+        context = benchmarks.get_context(options['formset_size'])
+        if context is None:
+            self.stdout.write('Generating synthetic data...')
+            try:
+                counts = SyntheticData(options['seed']).generate(
+                    options['clubs'], options['contests'],
+                    options['contestants']
+                )
+            except ValueError as e:
+                raise CommandError(e)
+            self.stdout.write(', '.join(
+                '{}: {}'.format(name, count)
+                for name, count in sorted(counts.items())
+            ))
+            context = benchmarks.get_context(options['formset_size'])
+        if context is None:
+            raise CommandError('There is no open contest to sign up to.')
+        return context
+
+    def handle(self, *args, **options):
+        context = self._get_context(options)
+        results = benchmarks.run(
+            context, options['scenarios'] or list(benchmarks.SCENARIOS),
+            options['requests'], options['concurrency'],
+            options['conn_max_age']
+        )
+
+        for scenario, result in results.items():
+            self.stdout.write('{}: {}'.format(scenario, ', '.join(
+                '{} {}'.format(metric, value)
+                for metric, value in result.items()
+            )))
+
+        path = options['baseline']
+        if options['save_baseline']:
+            with open(path, 'w') as baseline_file:
+                json.dump(results, baseline_file, indent=2)
+            self.stdout.write('Baseline saved to {}'.format(path))
+        elif os.path.exists(path):
+            with open(path) as baseline_file:
+                baseline = json.load(baseline_file)
+            regressions = benchmarks.compare(
+                results, baseline, options['tolerance']
+            )
+            if regressions:
+                raise CommandError(
+                    'Regressions since the baseline:\n{}'.format(
+                        '\n'.join(regressions)
+                    )
+                )
+            self.stdout.write('No regressions since the baseline.')
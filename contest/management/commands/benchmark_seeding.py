@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import random
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from contest.seeding import seed_events
+
+
+class Command(BaseCommand):
+    help = 'Measures seeding of synthetic entries.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--entries', type=int, default=5000,
+            help='Number of synthetic entries.'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Seed of the random generator.'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=10,
+            help='Number of measured runs.'
+        )
+
+    @staticmethod
+    def _get_rows(entries, seed):
+        """
+        Returns synthetic rows ordered like `get_seeding_rows` does.
+        """
+        generator = random.Random(seed)
+        rows = [
+            (
+                generator.randint(1, 5), generator.randint(1, 7),
+                generator.choice('FM'), generator.randint(2000, 2010),
+                pk, 'Imię', 'Nazwisko', generator.randint(20000, 600000)
+            ) for pk in xrange(entries)
+        ]
+        return sorted(rows, key=lambda row: row[:3] + row[-1:])
+
+    def handle(self, *args, **options):
+        rows = self._get_rows(options['entries'], options['seed'])
+        for circle in (False, True):
+            timings = []
+            for _ in xrange(options['repeat']):
+                start = time.time()
+                events = seed_events(
+                    rows, settings.SEEDING_LANES, settings.SEEDING_YEAR_BAND,
+                    circle
+                )
+                timings.append(time.time() - start)
+            self.stdout.write(
+                '{}: {} entries, {} events, best of {}: {:.2f} ms'.format(
+                    'circle' if circle else 'timed final', len(rows),
+                    len(events), options['repeat'], min(timings) * 1000
+                )
+            )
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+from django.db import DEFAULT_DB_ALIAS
+
+from contest import explain
+from contest.synthetic import SyntheticData
+
+
+class Command(BaseCommand):
+    help = (
+        'Prints query plans of the hottest queries on synthetic data and '
+        'fails if any of them scans a whole table.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--query', action='append', dest='queries',
+            choices=list(explain.QUERIES),
+            help='Query to explain, all of them by default.'
+        )
+        parser.add_argument(
+            '--clubs', type=int, default=2000,
+            help='Number of synthetic clubs, if there is no data yet.'
+        )
+        parser.add_argument(
+            '--contests', type=int, default=300,
+            help='Number of synthetic contests, if there is no data yet.'
+        )
+        parser.add_argument(
+            '--contestants', type=int, default=100000,
+            help='Number of synthetic contestants, if there is no data yet.'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Seed of the synthetic data generator.'
+        )
+
+    def _get_context(self, options):
+        context = explain.get_context()
+        if context is None:
+            self.stdout.write('Generating synthetic data...')
+            try:
+                SyntheticData(options['seed']).generate(
+                    options['clubs'], options['contests'],
+                    options['contestants']
+                )
+            except ValueError as e:
+                raise CommandError(e)
+            context = explain.get_context()
+        if context is None:
+            raise CommandError('There are no synthetic contests.')
+        return context
+
+    def handle(self, *args, **options):
+        if not explain.is_supported(DEFAULT_DB_ALIAS):
+            raise CommandError('Only SQLite and MySQL plans are supported.')
+        context = self._get_context(options)
+
+        full_scans = []
+        for name, plan in explain.run(context, options['queries']).items():
+            self.stdout.write(name)
+            for description, table in plan:
+                self.stdout.write('  {}'.format(description))
+                if table is not None:
+                    full_scans.append('{}: {}'.format(name, table))
+
+        if full_scans:
+            raise CommandError('Full table scans:\n{}'.format(
+                '\n'.join(full_scans)
+            ))
+        self.stdout.write('No full table scans.')
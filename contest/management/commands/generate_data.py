@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import time
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+
+from contest.synthetic import (
+    PASSWORD,
+    SyntheticData,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Fills the database with synthetic clubs, schools, contests and '
+        'contestants for scale testing.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clubs', type=int, default=1000,
+            help='Number of clubs.'
+        )
+        parser.add_argument(
+            '--schools', type=int, default=1000,
+            help='Number of schools.'
+        )
+        parser.add_argument(
+            '--contests', type=int, default=100,
+            help='Number of contests.'
+        )
+        parser.add_argument(
+            '--contestants', type=int, default=10000,
+            help='Number of contestants.'
+        )
+        parser.add_argument(
+            '--max-scores', type=int, default=3,
+            help='Max number of scores of a single contestant.'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Seed of the random generator.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of rows inserted by a single query.'
+        )
+
+    def handle(self, *args, **options):
+        start = time.time()
+        try:
+            counts = SyntheticData(
+                options['seed'], options['batch_size']
+            ).generate(
+                options['clubs'], options['contests'], options['contestants'],
+                options['schools'], options['max_scores']
+            )
+        except ValueError as e:
+            raise CommandError(e)
+        for name, count in sorted(counts.items()):
+            self.stdout.write('{}: {}'.format(name, count))
+        self.stdout.write(
+            'Created in {:.1f} s, users\' password: {}'.format(
+                time.time() - start, PASSWORD
+            )
+        )
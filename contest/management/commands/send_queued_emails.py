@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from contest.models import QueuedEmail
+
+
+class Command(BaseCommand):
+    help = 'Sends emails waiting in the queue.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.EMAIL_QUEUE_BATCH_SIZE,
+            help='Number of emails sent over a single connection.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the queue instead of exiting when it is empty.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds to wait between polls of an empty queue.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            start = time.time()
+            sent, failed = QueuedEmail.objects.send_queued(
+                options['batch_size']
+            )
+            if sent or failed:
+                self.stdout.write('Sent: {}, failed: {} in {:.2f} s'.format(
+                    sent, failed, time.time() - start
+                ))
+            elif not options['loop']:
+                break
+            else:
+                time.sleep(options['interval'])
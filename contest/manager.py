@@ -1,12 +1,172 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+import logging
+import threading
+import time
 import uuid
 
+from django.conf import settings
 from django.contrib.auth.models import BaseUserManager
 from django.contrib.contenttypes.models import ContentType
+from django.core.mail import get_connection
+from django.db import (
+    models,
+    transaction,
+)
+from django.db.models import Q
+from django.db.models.query import ModelIterable
+from django.utils import timezone
 
+from contest.utils import (
+    decode_cursor,
+    encode_cursor,
+)
 
-class RushUserManager(BaseUserManager):
+logger = logging.getLogger(__name__)
+
+
+def prefetch_generic_objects(instances, name, select_related=()):
+    """
+    Batch-loads targets of `name` generic relation for given instances,
+    running one query per content type instead of one per instance.
+    """
+    if not instances:
+        return
+
+    generic_field = getattr(type(instances[0]), name)
+    ct_field = generic_field.ct_field + '_id'
+    fk_field = generic_field.fk_field
+
+    ids_by_content_type = defaultdict(set)
+    for instance in instances:
+        content_type_id = getattr(instance, ct_field)
+        object_id = getattr(instance, fk_field)
+        if content_type_id is not None and object_id is not None:
+            ids_by_content_type[content_type_id].add(object_id)
+
+    objects = {}
+    for content_type_id, ids in ids_by_content_type.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        queryset = model._default_manager.all()
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        for obj in queryset.filter(pk__in=ids):
+            objects[(content_type_id, obj.pk)] = obj
+
+    for instance in instances:
+        key = (getattr(instance, ct_field), getattr(instance, fk_field))
+        setattr(instance, generic_field.cache_attr, objects.get(key))
+
+
+class _Deletions(threading.local):
+    """
+    Contests and contestants being deleted by a thread, see
+    `tracking_deletions`.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.contest_ids = set()
+        # Contestant's id: its contest's id and styles of deleted scores.
+        self.contestants = {}
+
+
+deletions = _Deletions()
+
+
+@contextmanager
+def tracking_deletions():
+    """
+    Makes contests and contestants deleted inside the block noted in
+    `deletions`, so counters are updated once for each of them. Notes are
+    dropped when the outermost block ends, also if a deletion fails.
+    """
+    deletions.depth += 1
+    try:
+        yield
+    finally:
+        deletions.depth -= 1
+        if not deletions.depth:
+            deletions.contest_ids.clear()
+            deletions.contestants.clear()
+
+
+class TrackedDeletionQuerySet(models.QuerySet):
+    """
+    QuerySet which deletes its objects inside `tracking_deletions`.
+    """
+    def delete(self):
+        with tracking_deletions():
+            return super(TrackedDeletionQuerySet, self).delete()
+
+
+class GenericPrefetchQuerySet(models.QuerySet):
+    """
+    QuerySet which resolves its generic relations in bulk when evaluated.
+    """
+    def __init__(self, *args, **kwargs):
+        super(GenericPrefetchQuerySet, self).__init__(*args, **kwargs)
+        self._generic_prefetch_lookups = []
+
+    def prefetch_generic(self, name, select_related=()):
+        """
+        Returns a new QuerySet that batch-loads `name` generic relation.
+        Targets are fetched with `select_related` applied.
+        """
+        clone = self._clone()
+        clone._generic_prefetch_lookups.append((name, select_related))
+        return clone
+
+    def _clone(self, **kwargs):
+        clone = super(GenericPrefetchQuerySet, self)._clone(**kwargs)
+        clone._generic_prefetch_lookups = self._generic_prefetch_lookups[:]
+        return clone
+
+    def _fetch_all(self):
+        is_fetched = self._result_cache is not None
+        super(GenericPrefetchQuerySet, self)._fetch_all()
+
+        if is_fetched or not issubclass(self._iterable_class, ModelIterable):
+            return
+        for name, select_related in self._generic_prefetch_lookups:
+            prefetch_generic_objects(self._result_cache, name, select_related)
+
+
+class ContestQuerySet(TrackedDeletionQuerySet, GenericPrefetchQuerySet):
+    """
+    Contest's QuerySet with keyset pagination of completed contests.
+    """
+    def completed(self):
+        """
+        Returns past contests, the latest first.
+        """
+        return self.filter(date__lt=timezone.now()).order_by('-date', '-pk')
+
+    def seek(self, cursor, size):
+        """
+        Returns `size` contests placed after `cursor` in `completed` order
+        and a cursor of the next page, if there's one.
+        """
+        queryset = self
+        if cursor:
+            date, pk = decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(date__lt=date) | Q(date=date, pk__lt=pk)
+            )
+
+        contests = list(queryset[:size + 1])
+        if len(contests) <= size:
+            return contests, None
+        contests = contests[:size]
+        return contests, encode_cursor(contests[-1].date, contests[-1].pk)
+
+
+class RushUserManager(
+    BaseUserManager.from_queryset(GenericPrefetchQuerySet)
+):
     """
     Manager for RushUser creation.
     """
@@ -43,6 +203,22 @@ class RushUserManager(BaseUserManager):
         user.save(using=self._db)
         return user
 
+    def activate(self, user_ids):
+        """
+        Activates inactive users with given ids with a single UPDATE.
+        Returns the activated users.
+        """
+        with transaction.atomic():
+            users = list(self.select_for_update().filter(
+                pk__in=user_ids, is_active=False
+            ))
+            self.filter(pk__in=[user.pk for user in users]).update(
+                is_active=True
+            )
+        for user in users:
+            user.is_active = True
+        return users
+
     def create_superuser(self, username, password, email):
         """
         Superuser creation.
@@ -57,3 +233,178 @@ class RushUserManager(BaseUserManager):
         user.save(using=self._db)
 
         return user
+
+
+class ContestStyleDistancesManager(models.Manager):
+    """
+    Manager keeping a single row per style and set of distances.
+    """
+    def get_or_create_many(self, styles_distances):
+        """
+        Returns contest styles for given `(style, distances)` pairs,
+        looking them up by signature in one query and creating missing ones.
+        """
+        signatures = [
+            self.model.get_signature(
+                style.pk, [distance.pk for distance in distances]
+            ) for style, distances in styles_distances
+        ]
+        existing = {
+            contest_style.signature: contest_style
+            for contest_style in self.filter(signature__in=signatures)
+        }
+
+        contest_styles = []
+        for signature, (style, distances) in zip(
+            signatures, styles_distances
+        ):
+            contest_style = existing.get(signature)
+            if contest_style is None:
+                contest_style, created = self.get_or_create(
+                    signature=signature, defaults={'style': style}
+                )
+                if created:
+                    contest_style.distances.add(*distances)
+                existing[signature] = contest_style
+            contest_styles.append(contest_style)
+
+        return contest_styles
+
+
+class QueuedEmailManager(models.Manager):
+    """
+    Manager of the outgoing emails queue.
+    """
+    def _from_message(self, message, bcc):
+        return self.model(
+            subject=message.subject,
+            body=message.body,
+            from_email=message.from_email,
+            to='\n'.join(message.to),
+            bcc='\n'.join(bcc),
+            content_subtype=message.content_subtype,
+        )
+
+    def enqueue(self, message):
+        """
+        Stores an `EmailMessage` to be sent by the queue worker.
+        """
+        queued_email = self._from_message(message, message.bcc)
+        queued_email.save()
+        return queued_email
+
+    def enqueue_many(self, messages):
+        """
+        Stores given `EmailMessage`s with one insert per
+        `EMAIL_QUEUE_BATCH_SIZE` of them. Returns a number of stored messages.
+        """
+        queued_emails = [
+            self._from_message(message, message.bcc) for message in messages
+        ]
+        self.bulk_create(
+            queued_emails, batch_size=settings.EMAIL_QUEUE_BATCH_SIZE
+        )
+        return len(queued_emails)
+
+    def enqueue_in_chunks(self, message, recipients, chunk_size):
+        """
+        Stores a copy of a message for every `chunk_size` recipients, who
+        are put in BCC. Recipients can be any iterable, e.g. a queryset
+        iterator, and only one batch of chunks is kept in memory.
+        Returns a number of stored messages.
+        """
+        queued_emails = []
+        chunk = []
+        count = 0
+
+        for recipient in recipients:
+            chunk.append(recipient)
+            if len(chunk) == chunk_size:
+                queued_emails.append(self._from_message(message, chunk))
+                chunk = []
+            if len(queued_emails) == settings.EMAIL_QUEUE_BATCH_SIZE:
+                self.bulk_create(queued_emails)
+                count += len(queued_emails)
+                queued_emails = []
+
+        if chunk:
+            queued_emails.append(self._from_message(message, chunk))
+        self.bulk_create(queued_emails)
+
+        return count + len(queued_emails)
+
+    def due(self):
+        """
+        Returns unsent emails which should be sent now.
+        """
+        return self.filter(
+            sent__isnull=True,
+            send_after__lte=timezone.now(),
+            attempts__lt=settings.EMAIL_QUEUE_MAX_ATTEMPTS,
+        ).order_by('send_after', 'pk')
+
+    def claim(self, batch_size):
+        """
+        Returns a batch of due emails, leased for `EMAIL_QUEUE_LEASE_TIME`
+        seconds so other senders skip them. Emails which aren't marked sent
+        or failed within the lease, e.g. after a crash, are due again.
+        """
+        with transaction.atomic():
+            queued_emails = list(
+                self.due().select_for_update()[:batch_size]
+            )
+            lease_end = timezone.now() + timedelta(
+                seconds=settings.EMAIL_QUEUE_LEASE_TIME
+            )
+            self.filter(
+                pk__in=[queued_email.pk for queued_email in queued_emails]
+            ).update(send_after=lease_end)
+        return queued_emails
+
+    def send_queued(self, batch_size=None):
+        """
+        Sends a batch of due emails over a single connection. Failed ones
+        are retried later with an exponential backoff. Emails are sent
+        outside of a transaction and each result is saved right away, so
+        a failure in the middle of a batch doesn't resend delivered ones.
+        Returns numbers of sent and failed emails.
+        """
+        batch_size = batch_size or settings.EMAIL_QUEUE_BATCH_SIZE
+        sent = failed = 0
+
+        queued_emails = self.claim(batch_size)
+        if not queued_emails:
+            return sent, failed
+
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as e:
+            for queued_email in queued_emails:
+                queued_email.mark_failed(e)
+            return sent, len(queued_emails)
+
+        try:
+            for queued_email in queued_emails:
+                message = queued_email.get_message()
+                start = time.time()
+                try:
+                    connection.send_messages([message])
+                except Exception as e:
+                    queued_email.mark_failed(e)
+                    failed += 1
+                    logger.warning(
+                        'Sending email %s failed: %r', queued_email.pk, e
+                    )
+                else:
+                    queued_email.mark_sent()
+                    sent += 1
+                    logger.info(
+                        'Sent email %s to %d recipients in %.1f ms',
+                        queued_email.pk, len(message.recipients()),
+                        (time.time() - start) * 1000
+                    )
+        finally:
+            connection.close()
+
+        return sent, failed
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from contest import profiling
+from rush import db
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+PIN_COOKIE = 'rush_primary'
+
+
+class UserRolesMiddleware(object):
+    """
+    Loads groups and permissions of a logged in user once per request, so
+    role checks in views and templates don't hit the database. Has to be
+    placed after `AuthenticationMiddleware`.
+    """
+
+    def process_request(self, request):
+        if request.user.is_authenticated():
+            request.user.load_roles()
+
+
+class ReplicaRoutingMiddleware(object):
+    """
+    Sends reads of safe requests to a replica, see `rush.db.ReplicaRouter`.
+    Once a request writes, its further reads and reads of requests sent
+    during `DATABASE_REPLICA_PIN_TIME` seconds go to the default database,
+    so users see their changes at once. Has to be placed before middlewares
+    reading the database.
+    """
+
+    def __init__(self):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+
+    def process_request(self, request):
+        db.start_replica_reads(
+            pinned=request.method not in SAFE_METHODS or
+            PIN_COOKIE in request.COOKIES
+        )
+
+    def process_response(self, request, response):
+        if db.stop_replica_reads():
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.DATABASE_REPLICA_PIN_TIME,
+                httponly=True
+            )
+        return response
+
+
+class QueryProfilingMiddleware(object):
+    """
+    Records queries, SQL time and template render time of every request and
+    reports them in a `Server-Timing` header and in logs. Enabled with
+    `QUERY_PROFILING` setting; requests over `QUERY_BUDGET` queries or with
+    duplicated queries are logged as warnings. Has to be placed first, to
+    include queries of other middlewares.
+    """
+
+    def __init__(self):
+        if not settings.QUERY_PROFILING:
+            raise MiddlewareNotUsed
+        profiling.install_template_timer()
+
+    def process_request(self, request):
+        request._profiling_start = time.time()
+        request._query_recorder = profiling.QueryRecorder()
+        request._query_recorder.start()
+        profiling.start_template_timer()
+
+    def process_response(self, request, response):
+        recorder = getattr(request, '_query_recorder', None)
+        if recorder is None:
+            return response
+        recorder.stop()
+        template_time = profiling.stop_template_timer()
+        total_time = (time.time() - request._profiling_start) * 1000
+        duplicates = profiling.get_duplicates(recorder.queries)
+
+        response['Server-Timing'] = ', '.join([
+            'sql;dur={:.1f};desc="{} queries"'.format(
+                recorder.sql_time, len(recorder.queries)
+            ),
+            'tpl;dur={:.1f}'.format(template_time),
+            'dup;desc="{} duplicated"'.format(len(duplicates)),
+            'total;dur={:.1f}'.format(total_time),
+        ])
+
+        profile = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': len(recorder.queries),
+            'sql_time': round(recorder.sql_time, 1),
+            'template_time': round(template_time, 1),
+            'total_time': round(total_time, 1),
+            'duplicates': duplicates,
+        }
+        over_budget = len(recorder.queries) > settings.QUERY_BUDGET
+        logger.log(
+            logging.WARNING if over_budget or duplicates else logging.INFO,
+            '%s %s: %d queries in %.1f ms, templates %.1f ms, '
+            '%d duplicated', request.method, request.path,
+            len(recorder.queries), recorder.sql_time, template_time,
+            len(duplicates), extra={'profile': profile}
+        )
+        return response
@@ -13,7 +13,7 @@ def _0005_auto_20160305_1951_forwards_func(apps, schema_editor):
     """
     Create user groups: Moderators, Administrators, Individual contestants.
     """
-    Group.objects.bulk_create([
+    Group.objects.using(schema_editor.connection.alias).bulk_create([
         Group(name='Moderators'),
         Group(name='Administrators'),
         Group(name='Individual contestants')
@@ -24,7 +24,7 @@ def _0005_auto_20160305_1951_backwards_func(apps, schema_editor):
     """
     Delete user groups: Moderators, Administrators, Individual contestants.
     """
-    Group.objects.filter(
+    Group.objects.using(schema_editor.connection.alias).filter(
         Q(name='Moderators') |
         Q(name='Administrators') |
         Q(name='Individual contestants')
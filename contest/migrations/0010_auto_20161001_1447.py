@@ -12,15 +12,16 @@ def add_styles_distances(apps, schema_editor):
     """
     Style = apps.get_model('contest', 'Style')
     Distance = apps.get_model('contest', 'Distance')
+    db_alias = schema_editor.connection.alias
 
-    Style.objects.bulk_create([
+    Style.objects.using(db_alias).bulk_create([
         Style(name='Dowolny'),
         Style(name='Grzbietowy'),
         Style(name='Klasyczny'),
         Style(name='Motylkowy'),
         Style(name='Zmienny')
     ])
-    Distance.objects.bulk_create([
+    Distance.objects.using(db_alias).bulk_create([
         Distance(value='25m'),
         Distance(value='50m'),
         Distance(value='100m'),
@@ -40,9 +41,10 @@ def remove_styles_distances(apps, schema_editor):
     ContestStylesDistances = apps.get_model(
         'contest', 'ContestStylesDistances'
     )
-    Style.objects.all().delete()
-    Distance.objects.all().delete()
-    ContestStylesDistances.objects.all().delete()
+    db_alias = schema_editor.connection.alias
+    Style.objects.using(db_alias).delete()
+    Distance.objects.using(db_alias).delete()
+    ContestStylesDistances.objects.using(db_alias).delete()
 
 
 class Migration(migrations.Migration):
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9 on 2026-10-18 20:00
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+def merge_contest_styles(apps, schema_editor):
+    """
+    Merges duplicated sets of a style with distances and fills signatures.
+    """
+    Contest = apps.get_model('contest', 'Contest')
+    ContestStyleDistances = apps.get_model('contest', 'ContestStyleDistances')
+    db_alias = schema_editor.connection.alias
+
+    kept = {}
+    contest_styles = ContestStyleDistances.objects.using(
+        db_alias
+    ).prefetch_related(
+        'distances'
+    ).order_by('pk')
+    for contest_style in contest_styles:
+        signature = '{}:{}'.format(
+            contest_style.style_id,
+            ','.join(
+                str(pk) for pk in sorted(
+                    distance.pk for distance in contest_style.distances.all()
+                )
+            )
+        )
+        if signature not in kept:
+            contest_style.signature = signature
+            contest_style.save(update_fields=['signature'])
+            kept[signature] = contest_style
+            continue
+
+        for contest in Contest.objects.using(db_alias).filter(
+            styles=contest_style
+        ):
+            contest.styles.remove(contest_style)
+            contest.styles.add(kept[signature])
+        contest_style.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contest', '0011_auto_20161019_0059'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conteststyledistances',
+            name='signature',
+            field=models.CharField(editable=False, max_length=128, null=True, unique=True),
+        ),
+        migrations.RunPython(
+            code=merge_contest_styles,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
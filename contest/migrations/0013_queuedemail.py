@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9 on 2026-10-18 20:01
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contest', '0012_contest_style_signature'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedEmail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255, verbose_name='temat')),
+                ('body', models.TextField(verbose_name='tre\u015b\u0107')),
+                ('from_email', models.CharField(max_length=255, verbose_name='nadawca')),
+                ('to', models.TextField(blank=True, verbose_name='odbiorcy')),
+                ('bcc', models.TextField(blank=True, verbose_name='ukryci odbiorcy')),
+                ('content_subtype', models.CharField(default='plain', max_length=16)),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='data utworzenia')),
+                ('send_after', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='wy\u015blij po')),
+                ('sent', models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='data wys\u0142ania')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='liczba pr\xf3b')),
+                ('last_error', models.TextField(blank=True, verbose_name='ostatni b\u0142\u0105d')),
+            ],
+        ),
+    ]
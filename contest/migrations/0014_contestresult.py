@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9 on 2026-10-18 20:03
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contest', '0013_queuedemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContestResult',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('place', models.PositiveSmallIntegerField(verbose_name='Miejsce')),
+                ('time_result', models.IntegerField(blank=True, null=True, verbose_name='Czas')),
+                ('contest', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contest.Contest')),
+                ('contestant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contest.Contestant')),
+                ('distance', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contest.Distance')),
+                ('style', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contest.Style')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='contestresult',
+            unique_together=set([('contest', 'style', 'distance', 'contestant')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='contestresult',
+            index_together=set([('contest', 'style', 'distance', 'place')]),
+        ),
+    ]
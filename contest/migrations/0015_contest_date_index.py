@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9 on 2026-10-18 20:11
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contest', '0014_contestresult'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='contest',
+            index_together=set([('date', 'id')]),
+        ),
+    ]
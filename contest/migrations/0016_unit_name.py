@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9 on 2026-10-18 20:15
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+def fill_unit_names(apps, schema_editor):
+    """
+    Copies names of schools and clubs to their users and contests.
+    """
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    db_alias = schema_editor.connection.alias
+    for unit_model_name in ('Club', 'School'):
+        content_type = ContentType.objects.using(db_alias).filter(
+            app_label='contest', model=unit_model_name.lower()
+        ).first()
+        if content_type is None:
+            continue
+        unit_model = apps.get_model('contest', unit_model_name)
+        for pk, name in unit_model.objects.using(db_alias).values_list(
+            'pk', 'name'
+        ):
+            for model_name in ('RushUser', 'Contest'):
+                apps.get_model('contest', model_name).objects.using(
+                    db_alias
+                ).filter(
+                    content_type=content_type, object_id=pk
+                ).update(unit_name=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('contest', '0015_contest_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contest',
+            name='unit_name',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True, verbose_name='Organizator'),
+        ),
+        migrations.AddField(
+            model_name='rushuser',
+            name='unit_name',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True, verbose_name='Szko\u0142a/Klub'),
+        ),
+        migrations.RunPython(fill_unit_names, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9 on 2026-10-18 20:16
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contest', '0016_unit_name'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='club',
+            name='name',
+            field=models.CharField(db_index=True, max_length=255, verbose_name='nazwa klubu'),
+        ),
+        migrations.AlterField(
+            model_name='school',
+            name='name',
+            field=models.CharField(db_index=True, max_length=255, verbose_name='nazwa szko\u0142y'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9 on 2026-10-18 20:39
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contest', '0017_unit_name_index'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='contest',
+            index_together=set([('date', 'id'), ('content_type', 'object_id')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='contestant',
+            index_together=set([('contest', 'moderator')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='rushuser',
+            index_together=set([('is_active', 'notifications', 'email'), ('content_type', 'object_id')]),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9 on 2026-10-18 20:41
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def count_entries(apps, schema_editor):
+    """
+    Fills counters of contestants and of scores by a style of contests.
+    """
+    Contest = apps.get_model('contest', 'Contest')
+    Contestant = apps.get_model('contest', 'Contestant')
+    ContestantScore = apps.get_model('contest', 'ContestantScore')
+    StyleEntryCount = apps.get_model('contest', 'StyleEntryCount')
+    db_alias = schema_editor.connection.alias
+
+    contestant_counts = Contestant.objects.using(db_alias).values_list(
+        'contest'
+    ).annotate(count=Count('pk')).order_by()
+    for contest_id, count in contestant_counts:
+        Contest.objects.using(db_alias).filter(pk=contest_id).update(
+            contestant_count=count
+        )
+
+    style_counts = ContestantScore.objects.using(db_alias).values_list(
+        'contestant__contest', 'style'
+    ).annotate(count=Count('pk')).order_by()
+    StyleEntryCount.objects.using(db_alias).bulk_create([
+        StyleEntryCount(contest_id=contest_id, style_id=style_id, count=count)
+        for contest_id, style_id, count in style_counts
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contest', '0018_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StyleEntryCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Liczba zg\u0142osze\u0144')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='contest',
+            name='contestant_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Liczba zawodnik\xf3w'),
+        ),
+        migrations.AddField(
+            model_name='styleentrycount',
+            name='contest',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='style_entry_counts', to='contest.Contest'),
+        ),
+        migrations.AddField(
+            model_name='styleentrycount',
+            name='style',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contest.Style'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='styleentrycount',
+            unique_together=set([('contest', 'style')]),
+        ),
+        migrations.RunPython(count_entries, migrations.RunPython.noop),
+    ]
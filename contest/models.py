@@ -1,51 +1,106 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
+from collections import Counter
+from datetime import timedelta
 from urlparse import urljoin
 
+from django.conf import settings
 from django.contrib.auth.base_user import AbstractBaseUser
 from django.contrib.auth.hashers import make_password
-from django.contrib.auth.models import PermissionsMixin
+from django.contrib.auth.models import (
+    Group,
+    Permission,
+    PermissionsMixin,
+)
 from django.contrib.auth.tokens import default_token_generator
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.core.mail import EmailMessage
 from django.core.urlresolvers import reverse
-from django.db import models
-from django.db.models import Q
+from django.db import (
+    IntegrityError,
+    models,
+    transaction,
+)
+from django.db.models import (
+    F,
+    Q,
+    Value,
+)
 from django.template import loader
 from django.utils.encoding import force_bytes
 from django.utils.html import format_html
 from django.utils.http import urlsafe_base64_encode
 from django.utils import timezone
 
-from contest.manager import RushUserManager
-from contest.utils import admin_utils
+from contest.manager import (
+    ContestStyleDistancesManager,
+    ContestQuerySet,
+    QueuedEmailManager,
+    RushUserManager,
+    TrackedDeletionQuerySet,
+    deletions,
+    tracking_deletions,
+)
+from contest.utils import (
+    admin_utils,
+    format_time_result,
+    union_all,
+)
 from contest.validators import LettersValidator
 
 UNIT_LIMIT = (
     Q(app_label='contest', model='club') |
     Q(app_label='contest', model='school')
 )
+ROLES_CACHE_ATTRS = (
+    '_group_names_cache', '_group_perm_cache', '_user_perm_cache',
+    '_perm_cache',
+)
 
 
 class UnitModelsMixin(object):
+    """
+    Common methods of models owned by a school or a club. Such a model keeps
+    unit's name in `unit_name`, see `update_unit_name`.
+    """
+    unit_field = 'unit'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(UnitModelsMixin, cls).from_db(db, field_names, values)
+        instance._loaded_unit_key = instance.get_unit_key()
+        return instance
+
+    def get_unit_key(self):
+        return (
+            self.__dict__.get('content_type_id'),
+            self.__dict__.get('object_id'),
+        )
 
-    def unit_name_select(self):
+    def update_unit_name(self):
         """
-        Returns organizations' names for purposes of admin panel.
+        Sets `unit_name` if the unit changed since the instance was loaded.
         """
-        school_options = admin_utils.get_options(
-            School, 'Szkoła', self.object_id, self.content_type
-        )
-        club_options = admin_utils.get_options(
-            Club, 'Klub', self.object_id, self.content_type
-        )
+        unit_key = self.get_unit_key()
+        if unit_key == getattr(self, '_loaded_unit_key', None):
+            return
+        unit = getattr(self, self.unit_field)
+        self.unit_name = unit.name if unit else None
+        self._loaded_unit_key = unit_key
 
+    def unit_name_select(self):
+        """
+        Returns an organization's autocomplete for purposes of admin panel.
+        Only the selected option is rendered, others are searched with
+        `UnitSearchView`.
+        """
+        unit = getattr(self, self.unit_field)
         return format_html(
-            '<select id="id_unit" name="unit">{}{}</select>'.format(
-                '<br>'.join(school_options),
-                '<br>'.join(club_options)
-            )
+            '<select id="id_unit" name="unit" class="unit-autocomplete" '
+            'data-url="{}">{}</select>',
+            reverse('contest:unit-search'),
+            admin_utils.get_option(unit) if unit else ''
         )
     unit_name_select.short_description = 'Szkoła/Klub'
     unit_name_select = property(unit_name_select)
@@ -67,7 +122,7 @@ class School(models.Model):
     """
     Stores sport clubs data.
     """
-    name = models.CharField('nazwa szkoły', max_length=255)
+    name = models.CharField('nazwa szkoły', max_length=255, db_index=True)
     contact = models.OneToOneField(
         Contact, on_delete=models.CASCADE, null=True,
     )
@@ -80,7 +135,7 @@ class Club(models.Model):
     """
     Stores sport clubs data.
     """
-    name = models.CharField('nazwa klubu', max_length=255)
+    name = models.CharField('nazwa klubu', max_length=255, db_index=True)
     code = models.IntegerField('kod klubu', default=0)
     contact = models.OneToOneField(
         Contact, on_delete=models.CASCADE, null=True,
@@ -119,6 +174,9 @@ class RushUser(UnitModelsMixin, PermissionsMixin, AbstractBaseUser):
     )
     object_id = models.PositiveIntegerField(blank=True, null=True)
     unit = GenericForeignKey('content_type', 'object_id')
+    unit_name = models.CharField(
+        'Szkoła/Klub', max_length=255, blank=True, null=True, editable=False
+    )
 
     objects = RushUserManager()
 
@@ -140,11 +198,61 @@ class RushUser(UnitModelsMixin, PermissionsMixin, AbstractBaseUser):
         """
         return self.last_name
 
+    def load_roles(self):
+        """
+        Loads names of user's groups and user's permissions in one query.
+        Permissions are stored in `ModelBackend` caches.
+        """
+        # Rows of group permissions and of user permissions are united
+        # instead of joined, as a join returns their product.
+        rows = union_all([
+            Group.objects.filter(user=self).values_list(
+                'permissions__content_type__app_label',
+                'permissions__codename', 'name'
+            ),
+            Permission.objects.filter(user=self).annotate(
+                group_name=Value(None, models.CharField())
+            ).values_list(
+                'content_type__app_label', 'codename', 'group_name'
+            ),
+        ])
+        group_names = set()
+        group_perms = set()
+        user_perms = set()
+        for app_label, codename, group in rows:
+            if group is None:
+                user_perms.add('{}.{}'.format(app_label, codename))
+                continue
+            group_names.add(group)
+            if codename:
+                group_perms.add('{}.{}'.format(app_label, codename))
+
+        self._group_names_cache = frozenset(group_names)
+        if not self.is_superuser:
+            self._group_perm_cache = group_perms
+            self._user_perm_cache = user_perms
+            self._perm_cache = group_perms | user_perms
+
+    def clear_roles(self):
+        """
+        Drops loaded groups and permissions.
+        """
+        for name in ROLES_CACHE_ATTRS:
+            self.__dict__.pop(name, None)
+
+    def get_group_names(self):
+        """
+        Returns names of user's groups.
+        """
+        if not hasattr(self, '_group_names_cache'):
+            self.load_roles()
+        return self._group_names_cache
+
     def has_perm(self, perm, obj=None):
         """
         Return True if user have specified permission.
         """
-        if self.groups.filter(name='Administrators') or self.is_staff:
+        if self.is_staff or 'Administrators' in self.get_group_names():
             return True
         return super(RushUser, self).has_perm(perm, obj)
 
@@ -179,24 +287,14 @@ class RushUser(UnitModelsMixin, PermissionsMixin, AbstractBaseUser):
         """
         Checks if it's an individual contestant.
         """
-        return self.groups.filter(name='Individual contestants').exists()
+        return 'Individual contestants' in self.get_group_names()
 
     @property
     def is_moderator(self):
         """
         Checks if it's a moderator.
         """
-        return self.groups.filter(name='Moderators').exists()
-
-    @property
-    def unit_name(self):
-        """
-        Return name of user's unit.
-        """
-        try:
-            return self.unit.name
-        except AttributeError:
-            return None
+        return 'Moderators' in self.get_group_names()
 
     def activate(self):
         """
@@ -218,9 +316,9 @@ class RushUser(UnitModelsMixin, PermissionsMixin, AbstractBaseUser):
         """
         self.delete()
 
-    def send_reset_password_email(self, request, initialization=False):
+    def get_reset_password_email(self, request, initialization=False):
         """
-        Sends an email with a link to reset password.
+        Returns an email with a link to reset password.
         """
         url_type = 'contest:{}'.format(
             'set-password' if initialization else 'reset-password'
@@ -249,7 +347,67 @@ class RushUser(UnitModelsMixin, PermissionsMixin, AbstractBaseUser):
         text = loader.render_to_string(template, context)
         msg = EmailMessage(subject, text, 'email_from@rush.pl', [self.email])
         msg.content_subtype = 'html'
-        msg.send()
+        return msg
+
+    def send_reset_password_email(self, request, initialization=False):
+        """
+        Sends an email with a link to reset password.
+        """
+        QueuedEmail.objects.enqueue(
+            self.get_reset_password_email(request, initialization)
+        )
+
+    class Meta:
+        # The first one covers the new contest notification query.
+        index_together = [
+            ('is_active', 'notifications', 'email'),
+            ('content_type', 'object_id'),
+        ]
+
+
+def invalidate_user_roles(sender, instance, reverse, **kwargs):
+    """
+    Drops user's loaded roles when its groups or permissions change.
+    """
+    if not reverse:
+        instance.clear_roles()
+
+
+def update_unit_name(sender, instance, raw=False, update_fields=None,
+                     **kwargs):
+    """
+    Resolves a unit's name of a saved user or contest. Fixtures are loaded
+    as they are.
+    """
+    if raw:
+        return
+    if update_fields is None or {'content_type', 'object_id'} & set(
+        update_fields
+    ):
+        instance.update_unit_name()
+
+
+def _set_unit_name(unit_model, unit_id, name):
+    content_type = ContentType.objects.get_for_model(unit_model)
+    for model in (RushUser, Contest):
+        model.objects.filter(
+            content_type=content_type, object_id=unit_id
+        ).update(unit_name=name)
+
+
+def propagate_unit_name(sender, instance, created, **kwargs):
+    """
+    Copies a name of a saved school or club to its users and contests.
+    """
+    if not created:
+        _set_unit_name(sender, instance.pk, instance.name)
+
+
+def clear_unit_name(sender, instance, **kwargs):
+    """
+    Clears a name of a deleted school or club in its users and contests.
+    """
+    _set_unit_name(sender, instance.pk, None)
 
 
 class Distance(models.Model):
@@ -278,10 +436,45 @@ class ContestStyleDistances(models.Model):
     """
     style = models.ForeignKey(Style)
     distances = models.ManyToManyField(Distance)
+    signature = models.CharField(
+        max_length=128, unique=True, null=True, editable=False
+    )
+
+    objects = ContestStyleDistancesManager()
 
     def __unicode__(self):
         return '{}: {}'.format(self.style.name, self.distances.all())
 
+    @staticmethod
+    def get_signature(style_id, distance_ids):
+        """
+        Returns a key identifying a style with a set of distances,
+        e.g. '1:2,3,4'.
+        """
+        return '{}:{}'.format(
+            style_id, ','.join(str(pk) for pk in sorted(distance_ids))
+        )
+
+    def update_signature(self):
+        """
+        Recalculates the signature after distances have changed.
+        """
+        signature = self.get_signature(
+            self.style_id, self.distances.values_list('pk', flat=True)
+        )
+        if signature != self.signature:
+            self.signature = signature
+            self.save(update_fields=['signature'])
+
+
+def update_contest_style_signature(sender, instance, action, reverse,
+                                   **kwargs):
+    """
+    Keeps `ContestStyleDistances.signature` in sync with its distances.
+    """
+    if not reverse and action in ('post_add', 'post_remove', 'post_clear'):
+        instance.update_signature()
+
 
 class Contest(UnitModelsMixin, models.Model):
     """
@@ -303,13 +496,27 @@ class Contest(UnitModelsMixin, models.Model):
     created_by = models.ForeignKey(RushUser, blank=True, null=True)
     object_id = models.PositiveIntegerField(blank=True, null=True)
     organizer = GenericForeignKey('content_type', 'object_id')
+    unit_name = models.CharField(
+        'Organizator', max_length=255, blank=True, null=True, editable=False
+    )
     styles = models.ManyToManyField(ContestStyleDistances)
+    contestant_count = models.PositiveIntegerField(
+        'Liczba zawodników', default=0, editable=False
+    )
+
+    objects = ContestQuerySet.as_manager()
+
+    unit_field = 'organizer'
 
     def __unicode__(self):
         return '{} - {} - {}'.format(
             self.name, self.place, self.date.strftime('%d-%m-%Y')
         )
 
+    def delete(self, *args, **kwargs):
+        with tracking_deletions():
+            return super(Contest, self).delete(*args, **kwargs)
+
     @property
     def is_submitting_open(self):
         """
@@ -325,6 +532,9 @@ class Contest(UnitModelsMixin, models.Model):
         """
         return self.date >= timezone.now()
 
+    class Meta:
+        index_together = [('date', 'id'), ('content_type', 'object_id')]
+
 
 def contest_directory_path(instance, filename):
     date_uploaded = instance.date_uploaded.strftime('%Y/%m/%d')
@@ -365,9 +575,24 @@ class Contestant(models.Model):
     )
     contest = models.ForeignKey(Contest)
 
+    objects = TrackedDeletionQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(Contestant, cls).from_db(db, field_names, values)
+        instance._counted_contest_id = instance.__dict__.get('contest_id')
+        return instance
+
     def __unicode__(self):
         return '{} {}'.format(self.first_name, self.last_name)
 
+    def delete(self, *args, **kwargs):
+        with tracking_deletions():
+            return super(Contestant, self).delete(*args, **kwargs)
+
+    class Meta:
+        index_together = [('contest', 'moderator')]
+
 
 class ContestantScore(models.Model):
     """
@@ -378,6 +603,12 @@ class ContestantScore(models.Model):
     distance = models.ForeignKey(Distance)
     time_result = models.IntegerField('Najlepszy czas', blank=True, null=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(ContestantScore, cls).from_db(db, field_names, values)
+        instance._counted_style_id = instance.__dict__.get('style_id')
+        return instance
+
     def __unicode__(self):
         return '{}: {} {} - {}s'.format(
             self.contestant, self.style.name,
@@ -385,10 +616,238 @@ class ContestantScore(models.Model):
         )
 
     def get_time_result(self):
-        time = int(self.time_result)
-        minutes, time = divmod(time, 60000)
-        seconds, ms = divmod(time, 1000)
-        return '{:0>2}:{:0>2}.{:0>2}'.format(minutes, seconds, ms / 10)
+        return format_time_result(self.time_result)
 
     class Meta:
         unique_together = ('contestant', 'style', 'distance')
+
+
+class StyleEntryCount(models.Model):
+    """
+    Number of contestants' scores of a style entered to a contest, kept by
+    `update_entry_counts`.
+    """
+    contest = models.ForeignKey(Contest, related_name='style_entry_counts')
+    style = models.ForeignKey(Style)
+    count = models.PositiveIntegerField('Liczba zgłoszeń', default=0)
+
+    class Meta:
+        unique_together = ('contest', 'style')
+
+
+def update_entry_counts(contest_id, contestants=0, styles=None):
+    """
+    Adds given number of contestants and numbers of scores by a style id to
+    counters of a contest. Counters are changed with `F()` expressions, so
+    concurrent changes don't overwrite each other.
+    """
+    # Counters are only displayed, emptiness checks query rows. They don't
+    # drop below zero on removing rows which were inserted without signals
+    # and so never counted.
+    if contestants:
+        Contest.objects.filter(
+            pk=contest_id, contestant_count__gte=-contestants
+        ).update(contestant_count=F('contestant_count') + contestants)
+    for style_id, count in sorted((styles or {}).items()):
+        if not count:
+            continue
+        counts = StyleEntryCount.objects.filter(
+            contest_id=contest_id, style_id=style_id, count__gte=-count
+        )
+        if counts.update(count=F('count') + count) or count < 0:
+            continue
+        try:
+            with transaction.atomic():
+                StyleEntryCount.objects.create(
+                    contest_id=contest_id, style_id=style_id, count=count
+                )
+        except IntegrityError:
+            # Created by a concurrent request in the meantime.
+            counts.update(count=F('count') + count)
+
+
+def count_contestant(sender, instance, created, raw=False, **kwargs):
+    """
+    Signal receiver counting a saved contestant in its contest, along with
+    its scores when it's moved to another contest.
+    """
+    if raw:
+        return
+    counted_contest_id = getattr(instance, '_counted_contest_id', None)
+    if created:
+        update_entry_counts(instance.contest_id, 1)
+    elif (
+        counted_contest_id is not None and
+        counted_contest_id != instance.contest_id
+    ):
+        styles = Counter(
+            instance.contestantscore_set.values_list('style_id', flat=True)
+        )
+        update_entry_counts(
+            counted_contest_id, -1,
+            {style_id: -count for style_id, count in styles.items()}
+        )
+        update_entry_counts(instance.contest_id, 1, styles)
+    instance._counted_contest_id = instance.contest_id
+
+
+def track_deletion(sender, instance, **kwargs):
+    """
+    Signal receiver noting a contest or a contestant which is going to be
+    deleted inside `tracking_deletions`. A deletion sends `pre_delete` of
+    all objects first, then deletes scores, contestants and contests in this
+    order, sending `post_delete` of each.
+    """
+    if not deletions.depth:
+        return
+    if isinstance(instance, Contest):
+        deletions.contest_ids.add(instance.pk)
+    else:
+        deletions.contestants[instance.pk] = (instance.contest_id, Counter())
+
+
+def untrack_contest(sender, instance, **kwargs):
+    """
+    Signal receiver forgetting a deleted contest.
+    """
+    deletions.contest_ids.discard(instance.pk)
+
+
+def uncount_contestant(sender, instance, **kwargs):
+    """
+    Signal receiver removing a deleted contestant from counters, along with
+    its deleted scores. Counters of a deleted contest are deleted with it.
+    """
+    contest_id, styles = deletions.contestants.pop(
+        instance.pk, (instance.contest_id, {})
+    )
+    if contest_id not in deletions.contest_ids:
+        update_entry_counts(
+            contest_id, -1,
+            {style_id: -count for style_id, count in styles.items()}
+        )
+
+
+def count_score(sender, instance, created, raw=False, **kwargs):
+    """
+    Signal receiver counting a saved score in its contest.
+    """
+    if raw:
+        return
+    counted_style_id = getattr(instance, '_counted_style_id', None)
+    if created:
+        styles = {instance.style_id: 1}
+    elif (
+        counted_style_id is not None and
+        counted_style_id != instance.style_id
+    ):
+        styles = {counted_style_id: -1, instance.style_id: 1}
+    else:
+        return
+    update_entry_counts(instance.contestant.contest_id, styles=styles)
+    instance._counted_style_id = instance.style_id
+
+
+def uncount_score(sender, instance, **kwargs):
+    """
+    Signal receiver removing a deleted score from counters, or leaving it to
+    `uncount_contestant` if its contestant is deleted too.
+    """
+    deleted_contestant = deletions.contestants.get(instance.contestant_id)
+    if deleted_contestant is not None:
+        deleted_contestant[1][instance.style_id] += 1
+        return
+    update_entry_counts(
+        instance.contestant.contest_id, styles={instance.style_id: -1}
+    )
+
+
+class ContestResult(models.Model):
+    """
+    Model for contestant's placement in contest's event.
+    """
+    contest = models.ForeignKey(Contest)
+    style = models.ForeignKey(Style)
+    distance = models.ForeignKey(Distance)
+    contestant = models.ForeignKey(Contestant)
+    place = models.PositiveSmallIntegerField('Miejsce')
+    time_result = models.IntegerField('Czas', blank=True, null=True)
+
+    def __unicode__(self):
+        return '{}. {}: {} {}'.format(
+            self.place, self.contestant, self.style.name, self.distance.value
+        )
+
+    def get_time_result(self):
+        if self.time_result is None:
+            return ''
+        return format_time_result(self.time_result)
+
+    class Meta:
+        unique_together = ('contest', 'style', 'distance', 'contestant')
+        index_together = [('contest', 'style', 'distance', 'place')]
+
+
+class QueuedEmail(models.Model):
+    """
+    Outgoing email waiting to be sent by `send_queued_emails` command.
+    """
+    subject = models.CharField('temat', max_length=255)
+    body = models.TextField('treść')
+    from_email = models.CharField('nadawca', max_length=255)
+    to = models.TextField('odbiorcy', blank=True)
+    bcc = models.TextField('ukryci odbiorcy', blank=True)
+    content_subtype = models.CharField(max_length=16, default='plain')
+    created = models.DateTimeField('data utworzenia', auto_now_add=True)
+    send_after = models.DateTimeField(
+        'wyślij po', default=timezone.now, db_index=True
+    )
+    sent = models.DateTimeField(
+        'data wysłania', blank=True, null=True, db_index=True
+    )
+    attempts = models.PositiveSmallIntegerField('liczba prób', default=0)
+    last_error = models.TextField('ostatni błąd', blank=True)
+
+    objects = QueuedEmailManager()
+
+    def __unicode__(self):
+        return '{} - {}'.format(self.subject, self.created)
+
+    def get_message(self):
+        """
+        Returns an `EmailMessage` built from stored data.
+        """
+        msg = EmailMessage(
+            subject=self.subject,
+            body=self.body,
+            from_email=self.from_email,
+            to=self.to.split(),
+            bcc=self.bcc.split(),
+        )
+        msg.content_subtype = self.content_subtype
+        return msg
+
+    def mark_sent(self):
+        """
+        Marks an email as sent.
+        """
+        self.sent = timezone.now()
+        self.attempts += 1
+        self.save(update_fields=['sent', 'attempts'])
+
+    def mark_failed(self, error):
+        """
+        Records a failed attempt and postpones the next one.
+        """
+        self.attempts += 1
+        self.last_error = repr(error)
+        self.send_after = timezone.now() + self.get_retry_delay()
+        self.save(update_fields=['attempts', 'last_error', 'send_after'])
+
+    def get_retry_delay(self):
+        """
+        Returns a delay before the next attempt, doubled after each failure.
+        """
+        return timedelta(
+            seconds=settings.EMAIL_QUEUE_RETRY_DELAY * 2 ** (self.attempts - 1)
+        )
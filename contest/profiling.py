@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+from collections import Counter
+import re
+import threading
+import time
+
+from django.db import connections
+from django.template.backends.django import Template
+
+_local = threading.local()
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_LIST_RE = re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)')
+
+
+def fingerprint(sql):
+    """
+    Returns SQL with literals replaced by `?`, so the same query with other
+    parameters gets the same fingerprint.
+    """
+    sql = _NUMBER_RE.sub('?', _STRING_RE.sub('?', sql))
+    return _LIST_RE.sub('(...)', sql)
+
+
+def get_duplicates(queries):
+    """
+    Returns `(fingerprint, count)` pairs of queries executed more than once,
+    the most frequent first.
+    """
+    counts = Counter(fingerprint(query['sql']) for query in queries)
+    return [(sql, count) for sql, count in counts.most_common() if count > 1]
+
+
+class QueryRecorder(object):
+    """
+    Records queries executed on all database connections, like
+    `CaptureQueriesContext`. The connection's log is a bounded deque, so it's
+    cleared when more than half full, otherwise new queries would push
+    the starting position out of it.
+    """
+
+    def __init__(self):
+        self._starts = {}
+        self._debug_cursors = {}
+        self.queries = []
+
+    def start(self):
+        for connection in connections.all():
+            self._debug_cursors[connection.alias] = (
+                connection.force_debug_cursor
+            )
+            connection.force_debug_cursor = True
+            if len(connection.queries_log) > connection.queries_limit // 2:
+                connection.queries_log.clear()
+            self._starts[connection.alias] = len(connection.queries_log)
+
+    def stop(self):
+        for connection in connections.all():
+            if connection.alias not in self._starts:
+                continue
+            connection.force_debug_cursor = self._debug_cursors[
+                connection.alias
+            ]
+            self.queries.extend(
+                list(connection.queries_log)[self._starts[connection.alias]:]
+            )
+
+    @property
+    def sql_time(self):
+        """
+        Returns total time of recorded queries, in milliseconds.
+        """
+        return sum(float(query['time']) for query in self.queries) * 1000
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def _timed_render(render):
+    def wrapper(self, *args, **kwargs):
+        timer = getattr(_local, 'template_timer', None)
+        if timer is None or timer['depth']:
+            return render(self, *args, **kwargs)
+        timer['depth'] += 1
+        start = time.time()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            timer['depth'] -= 1
+            timer['time'] += (time.time() - start) * 1000
+    wrapper.timed = True
+    return wrapper
+
+
+def install_template_timer():
+    """
+    Makes renders of Django templates measured in threads which called
+    `start_template_timer`.
+    """
+    if not getattr(Template.render, 'timed', False):
+        Template.render = _timed_render(Template.render)
+
+
+def start_template_timer():
+    _local.template_timer = {'depth': 0, 'time': 0.0}
+
+
+def stop_template_timer():
+    """
+    Returns time spent rendering templates since `start_template_timer`,
+    in milliseconds.
+    """
+    timer = getattr(_local, 'template_timer', None)
+    _local.template_timer = None
+    return timer['time'] if timer else 0.0
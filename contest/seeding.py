@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+from collections import namedtuple
+from itertools import (
+    cycle,
+    groupby,
+)
+
+from contest.models import ContestantScore
+from contest.utils import format_time_result
+
+MIN_HEAT_SIZE = 3
+CIRCLE_SEEDED_HEATS = 3
+
+
+class Entry(namedtuple(
+    'Entry', ['contestant_id', 'first_name', 'last_name', 'time_result']
+)):
+    __slots__ = ()
+
+    def get_time_result(self):
+        if self.time_result is None:
+            return ''
+        return format_time_result(self.time_result)
+
+
+Event = namedtuple(
+    'Event', ['style_id', 'distance_id', 'gender', 'years', 'heats']
+)
+
+
+def get_lane_order(lanes):
+    """
+    Returns lanes ordered from the fastest one, e.g. 3, 4, 2, 5, 1, 6.
+    """
+    center = (lanes + 1) // 2
+    return [
+        center + (i + 1) // 2 if i % 2 else center - i // 2
+        for i in xrange(lanes)
+    ]
+
+
+def get_heat_sizes(count, lanes):
+    """
+    Returns sizes of heats from the slowest one. All heats are full except
+    the first one, which takes at least `MIN_HEAT_SIZE` swimmers.
+    """
+    if not count:
+        return []
+    heats = (count + lanes - 1) // lanes
+    sizes = [lanes] * heats
+    sizes[0] = count - lanes * (heats - 1)
+    if heats > 1 and sizes[0] < MIN_HEAT_SIZE:
+        moved = min(MIN_HEAT_SIZE, lanes) - sizes[0]
+        sizes[0] += moved
+        sizes[1] -= moved
+    return sizes
+
+
+def _assign_lanes(heats, lanes):
+    lane_order = get_lane_order(lanes)
+    return [sorted(zip(lane_order, heat)) for heat in heats]
+
+
+def _fill_heats(heats, sizes, entries):
+    """
+    Fills heats from the last one with entries ordered from the fastest.
+    """
+    position = 0
+    for index in reversed(xrange(len(sizes))):
+        heats[index].extend(entries[position:position + sizes[index]])
+        position += sizes[index]
+
+
+def seed_timed_final(entries, lanes):
+    """
+    Returns heats of `(lane, entry)` pairs, the fastest swimmers in the last
+    heat. Entries have to be ordered from the fastest.
+    """
+    sizes = get_heat_sizes(len(entries), lanes)
+    heats = [[] for _ in sizes]
+    _fill_heats(heats, sizes, entries)
+    return _assign_lanes(heats, lanes)
+
+
+def seed_circle(entries, lanes):
+    """
+    Returns heats of `(lane, entry)` pairs, the fastest swimmers spread over
+    the last `CIRCLE_SEEDED_HEATS` heats. Entries have to be ordered from
+    the fastest.
+    """
+    sizes = get_heat_sizes(len(entries), lanes)
+    heats = [[] for _ in sizes]
+    circle = min(CIRCLE_SEEDED_HEATS, len(sizes))
+    circle_count = sum(sizes[len(sizes) - circle:])
+
+    circle_heats = cycle(xrange(len(sizes) - 1, len(sizes) - 1 - circle, -1))
+    for entry in entries[:circle_count]:
+        index = next(i for i in circle_heats if len(heats[i]) < sizes[i])
+        heats[index].append(entry)
+    _fill_heats(
+        heats[:len(sizes) - circle], sizes[:len(sizes) - circle],
+        entries[circle_count:]
+    )
+    return _assign_lanes(heats, lanes)
+
+
+def get_seeding_rows(contest):
+    """
+    Returns contest's entries ordered by an event and an entry time.
+    """
+    return ContestantScore.objects.filter(
+        contestant__contest=contest
+    ).order_by(
+        'style_id', 'distance_id', 'contestant__gender', 'time_result'
+    ).values_list(
+        'style_id', 'distance_id', 'contestant__gender',
+        'contestant__year_of_birth', 'contestant_id', 'contestant__first_name',
+        'contestant__last_name', 'time_result'
+    )
+
+
+def seed_events(rows, lanes, year_band, circle=False):
+    """
+    Splits rows returned by `get_seeding_rows` into events by a style,
+    a distance, a gender and a birth-year band, and seeds each of them.
+    Entries without time are seeded as the slowest ones.
+    """
+    seed = seed_circle if circle else seed_timed_final
+    events = []
+    for (style_id, distance_id, gender), group in groupby(
+        rows, lambda row: row[:3]
+    ):
+        bands = {}
+        for row in group:
+            band = row[3] - row[3] % year_band
+            timed, untimed = bands.setdefault(band, ([], []))
+            (untimed if row[-1] is None else timed).append(Entry(*row[4:]))
+        for band in sorted(bands):
+            timed, untimed = bands[band]
+            events.append(Event(
+                style_id, distance_id, gender, (band, band + year_band - 1),
+                seed(timed + untimed, lanes)
+            ))
+    return events
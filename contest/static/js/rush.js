@@ -32,6 +32,45 @@ function manageUser(user, create) {
     });
 }
 
+/*
+ * Creates or discards accounts of all selected users at once.
+ */
+function manageUsers(create) {
+    'use strict';
+    var csrfToken = $('input[name="csrfmiddlewaretoken"]').val();
+    var userIds = $('.user-checkbox:checked').map(function() {
+        return this.value;
+    }).get();
+    if (!userIds.length) {
+        Materialize.toast('Nie zaznaczono żadnego zgłoszenia', 4000);
+        return;
+    }
+    $.ajax({
+        type: 'POST',
+        url: '/administrator/konta/zbiorczo',
+        traditional: true,
+        data: {action: create ? 'create' : 'discard', users: userIds},
+        beforeSend: function(xhr, settings) {
+            xhr.setRequestHeader('X-CSRFToken', csrfToken);
+        },
+        error: function(){
+            Materialize.toast('Ups... wystąpił problem', 4000);
+        },
+        success: function(data){
+            var done = 0;
+            $.each(data.users, function(i, user) {
+                $('#user-' + user.id).remove();
+                if (user.status === 'done') {
+                    done += 1;
+                }
+            });
+            Materialize.toast(
+                (create ? 'Utworzono kont: ' : 'Odrzucono zgłoszeń: ') + done, 4000
+            );
+        }
+    });
+}
+
 /*
  * Contestant's validation prototype.
  */
@@ -939,3 +978,15 @@ function initializeClock(id, endtime) {
         }
     }
 }
+
+/*
+ * Replaces "load more" button with the next page of completed contests.
+ */
+function loadCompletedContests(link) {
+    'use strict';
+    $.get(link.href, function(html) {
+        $(link).closest('li').replaceWith(html);
+        $('.modal-trigger').leanModal();
+    });
+    return false;
+}
@@ -0,0 +1,57 @@
+/*
+ * Autocomplete of schools and clubs in the admin panel. Options are loaded
+ * page by page from the select's `data-url`, filtered by a name prefix.
+ */
+(function($) {
+    'use strict';
+
+    function UnitAutocomplete(select) {
+        this.select = select;
+        this.url = select.data('url');
+        this.selected = select.find('option:selected').clone();
+        this.page = 1;
+        this.timeout = null;
+
+        this.search = $('<input type="text" placeholder="Szukaj szkoły lub klubu">');
+        this.more = $('<a href="#">Więcej</a>').hide();
+
+        select.before(this.search).after(this.more);
+        this.search.on('input', $.proxy(this.onInput, this));
+        this.more.on('click', $.proxy(this.onMore, this));
+    }
+
+    UnitAutocomplete.prototype = {
+        onInput: function() {
+            clearTimeout(this.timeout);
+            this.timeout = setTimeout($.proxy(function() {
+                this.page = 1;
+                this.load(true);
+            }, this), 300);
+        },
+        onMore: function(event) {
+            event.preventDefault();
+            this.page += 1;
+            this.load(false);
+        },
+        load: function(replace) {
+            var params = {q: this.search.val(), strona: this.page};
+            $.getJSON(this.url, params, $.proxy(function(data) {
+                if (replace) {
+                    this.select.empty().append(this.selected.clone());
+                }
+                $.each(data.results, $.proxy(function(i, unit) {
+                    if (unit.id !== this.selected.val()) {
+                        this.select.append($('<option>').val(unit.id).text(unit.text));
+                    }
+                }, this));
+                this.more.toggle(data.more);
+            }, this));
+        }
+    };
+
+    $(function() {
+        $('select.unit-autocomplete').each(function() {
+            new UnitAutocomplete($(this));
+        });
+    });
+})(django.jQuery);
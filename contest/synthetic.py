@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+from collections import (
+    Counter,
+    defaultdict,
+)
+from datetime import timedelta
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.color import no_style
+from django.db import (
+    connection,
+    transaction,
+)
+from django.db.models import Max
+from django.utils import timezone
+
+from contest.models import (
+    Club,
+    Contact,
+    Contest,
+    ContestStyleDistances,
+    Contestant,
+    ContestantScore,
+    Distance,
+    RushUser,
+    School,
+    Style,
+    update_entry_counts,
+)
+
+FIRST_NAMES = (
+    'Adam', 'Anna', 'Jan', 'Maria', 'Piotr', 'Katarzyna', 'Tomasz', 'Zofia',
+    'Paweł', 'Agnieszka', 'Michał', 'Julia', 'Jakub', 'Natalia', 'Kacper',
+)
+LAST_NAMES = (
+    'Nowak', 'Kowalski', 'Wiśniewski', 'Wójcik', 'Kowalczyk', 'Kamiński',
+    'Lewandowski', 'Zieliński', 'Szymański', 'Woźniak', 'Dąbrowski',
+)
+PLACES = ('Piła', 'Poznań', 'Wałcz', 'Chodzież', 'Trzcianka', 'Złotów')
+EMAIL_DOMAIN = 'rush.invalid'
+USER_EMAIL = 'synthetic{}@' + EMAIL_DOMAIN
+PASSWORD = 'synthetic'
+
+
+class SyntheticData(object):
+    """
+    Fills the database with random, but reproducible for given seed, clubs
+    and schools with contacts, their users, contests and contestants with
+    scores. Rows are inserted with `bulk_create` in batches of `batch_size`
+    and get primary keys assigned up front, so related rows don't have to be
+    read back.
+    """
+
+    def __init__(self, seed=0, batch_size=1000):
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.counts = {}
+        self._next_pks = {}
+
+    def _insert(self, model, rows):
+        """
+        Inserts rows of given model in batches, setting their primary keys.
+        """
+        pk = self._next_pks.get(model)
+        if pk is None:
+            pk = (model.objects.aggregate(pk=Max('pk'))['pk'] or 0) + 1
+        count = 0
+        batch = []
+        for row in rows:
+            row.pk = pk + count
+            count += 1
+            batch.append(row)
+            if len(batch) == self.batch_size:
+                model.objects.bulk_create(batch)
+                batch = []
+        model.objects.bulk_create(batch)
+        self._next_pks[model] = pk + count
+        name = model._meta.model_name
+        self.counts[name] = self.counts.get(name, 0) + count
+
+    def _get_name(self):
+        return (
+            self.random.choice(FIRST_NAMES), self.random.choice(LAST_NAMES)
+        )
+
+    def _create_units(self, model, count, label):
+        """
+        Creates clubs or schools along with their contacts. Returns
+        `(content_type_id, pk, name)` of every unit.
+        """
+        contacts = [
+            Contact(
+                email='{}{}@{}'.format(
+                    model._meta.model_name, number, EMAIL_DOMAIN
+                ),
+                phone_number='{:09d}'.format(
+                    self.random.randint(500000000, 899999999)
+                )
+            ) for number in xrange(count)
+        ]
+        self._insert(Contact, contacts)
+
+        units = [
+            model(
+                name='{} {} {}'.format(
+                    label, self.random.choice(PLACES), number
+                ),
+                contact_id=contact.pk
+            ) for number, contact in enumerate(contacts)
+        ]
+        if model is Club:
+            for number, unit in enumerate(units):
+                unit.code = number
+        self._insert(model, units)
+
+        content_type_id = ContentType.objects.get_for_model(model).pk
+        return [(content_type_id, unit.pk, unit.name) for unit in units]
+
+    def _create_users(self, units):
+        """
+        Creates an active user of every unit, all with `PASSWORD`. Returns
+        users.
+        """
+        password = make_password(PASSWORD)
+        start = self._next_pks.get(RushUser) or (
+            RushUser.objects.aggregate(pk=Max('pk'))['pk'] or 0
+        ) + 1
+
+        users = []
+        for offset, (content_type_id, unit_pk, unit_name) in enumerate(units):
+            first_name, last_name = self._get_name()
+            users.append(RushUser(
+                username='synthetic{}'.format(start + offset),
+                email=USER_EMAIL.format(start + offset),
+                first_name=first_name, last_name=last_name,
+                password=password, is_active=True,
+                content_type_id=content_type_id, object_id=unit_pk,
+                unit_name=unit_name
+            ))
+        self._insert(RushUser, users)
+        return users
+
+    def _get_distances(self):
+        """
+        Returns `(style_id, distance_id)` pairs of every style set, creating
+        sets of short and of all distances of every style.
+        """
+        distances = list(Distance.objects.order_by('pk'))
+        ContestStyleDistances.objects.get_or_create_many([
+            (style, style_distances)
+            for style in Style.objects.order_by('pk')
+            for style_distances in (distances[:3], distances)
+            if style_distances
+        ])
+
+        distances = {}
+        for pk, style_id, distance_id in ContestStyleDistances.objects.filter(
+            distances__isnull=False
+        ).values_list('pk', 'style_id', 'distances'):
+            distances.setdefault(pk, []).append((style_id, distance_id))
+        return distances
+
+    def _create_contests(self, count, users):
+        """
+        Creates contests, dated up to a year back or forth, each one
+        organized by a unit of its creator. Returns contests.
+        """
+        now = timezone.now()
+        contests = []
+        for number in xrange(count):
+            user = self.random.choice(users)
+            date = now + timedelta(days=self.random.randint(-365, 365))
+            lowest_year = self.random.randint(1995, 2010)
+            contests.append(Contest(
+                name='Zawody {}'.format(number),
+                date=date, deadline=date - timedelta(days=7),
+                place=self.random.choice(PLACES),
+                lowest_year=lowest_year, highest_year=lowest_year + 5,
+                created_by_id=user.pk, content_type_id=user.content_type_id,
+                object_id=user.object_id, unit_name=user.unit_name
+            ))
+        self._insert(Contest, contests)
+        return contests
+
+    def _create_contest_styles(self, contests):
+        """
+        Assigns random style sets to contests. Returns `(style_id,
+        distance_id)` pairs allowed in a contest by its primary key.
+        """
+        distances = self._get_distances()
+        styles = sorted(distances)
+        events = {}
+        rows = []
+        through = Contest.styles.through
+        for contest in contests:
+            chosen = self.random.sample(
+                styles, self.random.randint(min(len(styles), 1), len(styles))
+            )
+            events[contest.pk] = sorted(set(
+                event for pk in chosen for event in distances[pk]
+            ))
+            rows.extend(
+                through(contest_id=contest.pk, conteststyledistances_id=pk)
+                for pk in chosen
+            )
+        self._insert(through, rows)
+        return events
+
+    def _get_scores(self, contestant, events, max_scores):
+        for style_id, distance_id in self.random.sample(
+            events, min(len(events), self.random.randint(1, max_scores))
+        ):
+            yield ContestantScore(
+                contestant_id=contestant.pk, style_id=style_id,
+                distance_id=distance_id,
+                time_result=self.random.randint(20000, 600000)
+            )
+
+    def _create_contestants(self, count, contests, users, events,
+                            max_scores):
+        """
+        Creates contestants with one to `max_scores` scores each and counts
+        them in their contests. Only one batch of contestants and their
+        scores is kept in memory.
+        """
+        contestant_counts = Counter()
+        style_counts = defaultdict(Counter)
+        for start in xrange(0, count, self.batch_size):
+            contestants = []
+            for _ in xrange(min(self.batch_size, count - start)):
+                contest = self.random.choice(contests)
+                first_name, last_name = self._get_name()
+                contestants.append(Contestant(
+                    moderator_id=self.random.choice(users).pk,
+                    first_name=first_name, last_name=last_name,
+                    gender=self.random.choice('FM'),
+                    year_of_birth=(
+                        contest.lowest_year + self.random.randint(0, 5)
+                    ),
+                    school=self.random.choice('PGS'), contest_id=contest.pk
+                ))
+            self._insert(Contestant, contestants)
+            scores = [
+                score for contestant in contestants
+                for score in self._get_scores(
+                    contestant, events[contestant.contest_id], max_scores
+                )
+            ]
+            self._insert(ContestantScore, scores)
+            contest_ids = {
+                contestant.pk: contestant.contest_id
+                for contestant in contestants
+            }
+            contestant_counts.update(contest_ids.values())
+            for score in scores:
+                contest_id = contest_ids[score.contestant_id]
+                style_counts[contest_id][score.style_id] += 1
+
+        for contest_id, contestant_count in sorted(contestant_counts.items()):
+            update_entry_counts(
+                contest_id, contestant_count, style_counts[contest_id]
+            )
+
+    def _reset_sequences(self):
+        """
+        Moves primary key sequences past the inserted rows.
+        """
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(), list(self._next_pks)
+            ):
+                cursor.execute(sql)
+
+    def generate(self, clubs, contests, contestants, schools=0,
+                 max_scores=3):
+        """
+        Creates given numbers of clubs and schools, with one user each,
+        contests and contestants. Returns numbers of created rows by a model
+        name. Raises ValueError if contests or contestants couldn't be
+        assigned to any unit or contest.
+        """
+        if contests and not clubs + schools:
+            raise ValueError('Contests need at least one club or school.')
+        if contestants and not contests:
+            raise ValueError('Contestants need at least one contest.')
+
+        with transaction.atomic():
+            units = self._create_units(Club, clubs, 'Klub')
+            units += self._create_units(School, schools, 'Szkoła')
+            users = self._create_users(units)
+            contests = self._create_contests(contests, users)
+            events = self._create_contest_styles(contests)
+            self._create_contestants(
+                contestants, contests, users, events, max_scores
+            )
+            self._reset_sequences()
+        return self.counts
@@ -14,6 +14,7 @@ from django.http import HttpRequest
 from contest.admin import RushUserAdmin
 from contest.models import (
     Club,
+    QueuedEmail,
     RushUser,
 )
 
@@ -55,9 +56,16 @@ class AdminMethodTests(TestCase):
         self.assertEqual(self.user_1.username, self.initial_user1_username)
         self.assertEqual(self.user_2.username, self.initial_user_2_username)
 
-        queryset = [self.user_1, self.user_2, self.user_3]
+        self.user_3.save()
+        queryset = RushUser.objects.filter(
+            pk__in=[self.user_1.pk, self.user_2.pk, self.user_3.pk]
+        )
         self.app_admin.create(self.request, queryset)
+        self.user_1.refresh_from_db()
+        self.user_2.refresh_from_db()
 
+        self.assertEqual(len(mail.outbox), 0)
+        QueuedEmail.objects.send_queued()
         self.assertEqual(len(mail.outbox), 2)
         self.assertEqual(mail.outbox[0].to, [self.user_1.email])
         self.assertEqual(mail.outbox[1].to, [self.user_2.email])
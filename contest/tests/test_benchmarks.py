@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+from io import BytesIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.test import TestCase
+
+from contest import benchmarks
+from contest.catalog import catalog
+from contest.models import (
+    Club,
+    Contact,
+    Contest,
+    Contestant,
+    ContestantScore,
+    RushUser,
+    School,
+)
+from contest.synthetic import SyntheticData
+
+
+class BenchmarksTestCase(TestCase):
+
+    def tearDown(self):
+        catalog.invalidate()
+
+    def test_percentile(self):
+        values = range(1, 101)
+        self.assertEqual(benchmarks.percentile(values, 50), 50)
+        self.assertEqual(benchmarks.percentile(values, 99), 99)
+        self.assertEqual(benchmarks.percentile([7], 95), 7)
+
+    def test_compare(self):
+        baseline = {'home': {'p95': 10.0, 'queries': 3}}
+        self.assertEqual(benchmarks.compare(
+            {'home': {'p95': 11.0, 'queries': 3}}, baseline, 20
+        ), [])
+        self.assertEqual(benchmarks.compare(
+            {'home': {'p95': 13.0, 'queries': 4}}, baseline, 20
+        ), ['home p95: 10.0 -> 13.0', 'home queries: 3 -> 4'])
+
+    def test_synthetic_data(self):
+        counts = SyntheticData(seed=1, batch_size=7).generate(
+            5, 4, 30, schools=2
+        )
+
+        self.assertEqual(Club.objects.count(), 5)
+        self.assertEqual(School.objects.count(), 2)
+        self.assertEqual(Contact.objects.count(), 7)
+        self.assertEqual(RushUser.objects.count(), 7)
+        self.assertEqual(Contest.objects.count(), 4)
+        self.assertEqual(Contestant.objects.count(), 30)
+        self.assertEqual(
+            counts['contestantscore'], ContestantScore.objects.count()
+        )
+        self.assertFalse(Contest.objects.filter(unit_name=None).exists())
+
+    def test_synthetic_data_without_owners(self):
+        with self.assertRaisesMessage(
+            CommandError, 'Contests need at least one club or school.'
+        ):
+            call_command('generate_data', clubs=0, schools=0, stdout=BytesIO())
+        with self.assertRaisesMessage(
+            CommandError, 'Contestants need at least one contest.'
+        ):
+            call_command('generate_data', contests=0, stdout=BytesIO())
+        self.assertFalse(Club.objects.exists())
+
+    def test_synthetic_data_seed(self):
+        def generate():
+            with transaction.atomic():
+                SyntheticData(seed=1, batch_size=7).generate(2, 2, 10)
+                rows = list(ContestantScore.objects.order_by('pk').values_list(
+                    'contestant__first_name', 'contestant__contest__name',
+                    'style', 'distance', 'time_result'
+                ))
+                transaction.set_rollback(True)
+            return rows
+
+        self.assertEqual(generate(), generate())
+
+    def test_run(self):
+        SyntheticData(seed=1).generate(3, 10, 20)
+        context = benchmarks.get_context(formset_size=2)
+        contestants = Contestant.objects.filter(contest=context['contest_id'])
+        count = contestants.count()
+        results = benchmarks.run(context, list(benchmarks.SCENARIOS), 2)
+
+        self.assertEqual(list(results), list(benchmarks.SCENARIOS))
+        for result in results.values():
+            self.assertEqual(result['requests'], 2)
+            self.assertEqual(result['errors'], 0)
+            self.assertIsNotNone(result['queries'])
+        self.assertEqual(contestants.count(), count + 4)
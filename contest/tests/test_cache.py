@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from mock import patch
+
+from contest.cache import (
+    MAX_KEY_LENGTH,
+    get_key,
+    invalidate_namespace,
+    make_key,
+)
+
+
+class CacheTestCase(SimpleTestCase):
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_make_key(self):
+        self.assertEqual(make_key('home:v1:fragments', 'rush', 1),
+                         'rush:1:home:v1:fragments')
+
+        for key in ('a' * MAX_KEY_LENGTH, 'zawody 1', 'zawody\n1'):
+            full_key = make_key(key, 'rush', 1)
+            self.assertTrue(full_key.startswith('rush:1:hash:'))
+            self.assertLessEqual(len(full_key), MAX_KEY_LENGTH)
+            self.assertEqual(make_key(key, 'rush', 1), full_key)
+        self.assertNotEqual(
+            make_key('zawody 1', 'rush', 1), make_key('zawody 2', 'rush', 1)
+        )
+
+    def test_get_key(self):
+        key = get_key('home', 'fragments', 3)
+        self.assertRegexpMatches(key, r'^home:v\d+:fragments:3$')
+        self.assertEqual(get_key('home', 'fragments', 3), key)
+        self.assertNotEqual(get_key('contest', 'fragments', 3), key)
+
+    def test_get_key_added_concurrently(self):
+        with patch.object(cache, 'add', return_value=False):
+            key = get_key('home', 'fragments')
+        self.assertRegexpMatches(key, r'^home:v\d+:fragments$')
+
+    def test_invalidate_namespace(self):
+        invalidate_namespace('home')
+
+        key = get_key('home', 'fragments')
+        other_key = get_key('contest', 'fragments')
+        cache.set(key, 'home')
+        cache.set(other_key, 'contest')
+        invalidate_namespace('home')
+
+        self.assertNotEqual(get_key('home', 'fragments'), key)
+        self.assertIsNone(cache.get(get_key('home', 'fragments')))
+        self.assertEqual(get_key('contest', 'fragments'), other_key)
+        self.assertEqual(cache.get(other_key), 'contest')
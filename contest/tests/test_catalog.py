@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.test import TestCase
+
+from contest.catalog import catalog
+from contest.models import (
+    Distance,
+    Style,
+)
+
+
+class CatalogTestCase(TestCase):
+    fixtures = ['styles.json', 'distances.json']
+
+    def setUp(self):
+        catalog.invalidate()
+
+    def tearDown(self):
+        catalog.invalidate()
+
+    def test_lookups(self):
+        with self.assertNumQueries(2):
+            style = catalog.get_style('Dowolny')
+            distance = catalog.get_distance('50m')
+            self.assertEqual(catalog.get(Style, style.pk), style)
+            self.assertEqual(catalog.get(Distance, distance.pk), distance)
+            self.assertEqual(catalog.get_style('Motylkowy').name, 'Motylkowy')
+
+        with self.assertRaises(Style.DoesNotExist):
+            catalog.get_style('Żabka')
+        with self.assertRaises(Distance.DoesNotExist):
+            catalog.get_distance('10m')
+        with self.assertRaises(Distance.DoesNotExist):
+            catalog.get(Distance, 865)
+
+    def test_invalidation(self):
+        with self.assertRaises(Style.DoesNotExist):
+            catalog.get_style('Żabka')
+
+        style = Style.objects.create(name='Żabka')
+        self.assertEqual(catalog.get_style('Żabka'), style)
+
+        style.delete()
+        with self.assertRaises(Style.DoesNotExist):
+            catalog.get_style('Żabka')
+
+        Distance.objects.filter(value='50m').update(value='60m')
+        self.assertEqual(catalog.get_distance('50m').value, '50m')
+        Distance.objects.get(value='60m').save()
+        self.assertEqual(catalog.get_distance('60m').value, '60m')
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from datetime import timedelta
+
+from django.core.urlresolvers import reverse
+from django.db import router
+from django.test import (
+    SimpleTestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.utils import timezone
+from mock import (
+    Mock,
+    patch,
+)
+
+from contest.fragments import get_home_fragments
+from contest.middleware import PIN_COOKIE
+from contest.models import (
+    Contest,
+    RushUser,
+    Style,
+)
+from rush.db import (
+    close_unusable_connections,
+    start_replica_reads,
+    stop_replica_reads,
+    use_replica,
+)
+
+
+class DatabaseTestCase(SimpleTestCase):
+
+    def _get_connection(self, is_usable, health_checks=True):
+        return Mock(
+            connection=object(), in_atomic_block=False,
+            settings_dict={'CONN_HEALTH_CHECKS': health_checks},
+            is_usable=Mock(return_value=is_usable)
+        )
+
+    def test_close_unusable_connections(self):
+        usable = self._get_connection(True)
+        unusable = self._get_connection(False)
+        unchecked = self._get_connection(False, health_checks=False)
+        with patch('rush.db.connections') as connections:
+            connections.all.return_value = [usable, unusable, unchecked]
+            close_unusable_connections()
+
+        self.assertFalse(usable.close.called)
+        self.assertTrue(unusable.close.called)
+        self.assertFalse(unchecked.is_usable.called)
+        self.assertFalse(unchecked.close.called)
+
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    def test_use_replica(self):
+        self.assertEqual(Contest.objects.all().db, 'default')
+        with use_replica() as alias:
+            self.assertEqual(alias, 'replica')
+            self.assertEqual(Contest.objects.all().db, 'replica')
+            self.assertEqual(router.db_for_write(Contest), 'default')
+            self.assertEqual(Contest.objects.all().db, 'default')
+        self.assertEqual(Contest.objects.all().db, 'default')
+
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    def test_replica_reads(self):
+        start_replica_reads(pinned=True)
+        self.assertEqual(Contest.objects.all().db, 'default')
+        self.assertFalse(stop_replica_reads())
+
+        start_replica_reads()
+        self.assertEqual(Contest.objects.all().db, 'replica')
+        router.db_for_write(Contest)
+        self.assertTrue(stop_replica_reads())
+
+    def test_use_replica_without_replicas(self):
+        with use_replica() as alias:
+            self.assertEqual(alias, 'default')
+            self.assertEqual(Contest.objects.all().db, 'default')
+
+    def test_allow_migrate(self):
+        with self.settings(DATABASE_REPLICAS=['replica']):
+            self.assertFalse(router.allow_migrate('replica', 'contest'))
+            self.assertTrue(router.allow_migrate('default', 'contest'))
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTestCase(TransactionTestCase):
+    multi_db = True
+
+    def setUp(self):
+        user = RushUser.objects.create_superuser(
+            email='admin@admin.pl', username='admin', password='password'
+        )
+        user.save(using='replica')
+        Style.objects.using('replica').create(name='Replika')
+        self.client.login(username='admin', password='password')
+        self.url = reverse('api:style-list')
+
+    def tearDown(self):
+        # Flushing skips the replica, as the router doesn't migrate it.
+        Style.objects.using('replica').all().delete()
+        RushUser.objects.using('replica').all().delete()
+
+    def _get_names(self):
+        response = self.client.get(self.url)
+        return [style['name'] for style in response.data['results']]
+
+    def test_routing(self):
+        self.assertIn('Replika', self._get_names())
+
+        response = self.client.post(self.url, {'name': 'Nowy'})
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        names = self._get_names()
+        self.assertIn('Nowy', names)
+        self.assertNotIn('Replika', names)
+
+        del self.client.cookies[PIN_COOKIE]
+        names = self._get_names()
+        self.assertIn('Replika', names)
+        self.assertNotIn('Nowy', names)
+
+    def test_home_fragments(self):
+        date = timezone.now() + timedelta(days=30)
+        contest = Contest.objects.create(
+            name='Nowe', place='Basen', lowest_year=2000, highest_year=2005,
+            date=date, deadline=date
+        )
+        with use_replica():
+            fragments = get_home_fragments()
+        self.assertEqual(
+            [item['contest'] for item in fragments['upcoming']], [contest]
+        )
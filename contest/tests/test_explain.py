@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.test import TestCase
+from mock import Mock
+
+from contest import explain
+from contest.models import Contestant
+from contest.synthetic import SyntheticData
+
+
+class ExplainTestCase(TestCase):
+
+    def test_explain(self):
+        plan = explain.explain(Contestant.objects.filter(first_name='Jan'))
+        self.assertEqual(
+            [table for _, table in plan], ['contest_contestant']
+        )
+
+    def test_explain_index_scan(self):
+        plan = explain.explain(
+            Contestant.objects.order_by('contest').values_list('contest')
+        )
+        self.assertIn('INDEX', plan[0][0])
+        self.assertEqual(
+            [table for _, table in plan], ['contest_contestant']
+        )
+
+    def test_explain_mysql(self):
+        columns = ('table', 'type', 'key', 'rows', 'Extra')
+        cursor = Mock(
+            description=[(column,) for column in columns],
+            fetchall=Mock(return_value=[
+                ('contest_contest', 'ref', 'date_idx', 10, ''),
+                ('contest_contestant', 'index', 'contest_idx', 500,
+                 'Using index'),
+                ('contest_rushuser', 'ALL', None, 900, 'Using where'),
+            ])
+        )
+        plan = explain._explain_mysql(cursor, 'SELECT 1', [])
+        self.assertEqual(
+            [table for _, table in plan],
+            [None, 'contest_contestant', 'contest_rushuser']
+        )
+        self.assertEqual(
+            plan[0][0], 'contest_contest: ref, key date_idx, rows 10, '
+        )
+
+    def test_run(self):
+        self.assertIsNone(explain.get_context())
+        SyntheticData(seed=1).generate(3, 4, 20)
+        context = explain.get_context()
+        plans = explain.run(context)
+
+        self.assertEqual(list(plans), list(explain.QUERIES))
+        for name, plan in plans.items():
+            self.assertTrue(plan)
+            for description, table in plan:
+                self.assertIsNone(table, '{}: {}'.format(name, description))
@@ -1,9 +1,28 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+from datetime import timedelta
+
+from django.contrib.auth.models import (
+    Group,
+    Permission,
+)
+from django.core import mail
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.core.mail import EmailMessage
+from django.db import (
+    DatabaseError,
+    connection,
+    transaction,
+)
+from django.db.models.sql.subqueries import DeleteQuery
+from django.test import (
+    override_settings,
+    TestCase,
+)
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
+from mock import patch
 
 from contest.models import (
     Club,
@@ -12,12 +31,15 @@ from contest.models import (
     contest_directory_path,
     Contestant,
     ContestFiles,
+    QueuedEmail,
     RushUser,
     School,
     ContestantScore,
     Style,
     Distance,
-    ContestStyleDistances
+    ContestStyleDistances,
+    StyleEntryCount,
+    update_entry_counts,
 )
 
 
@@ -66,6 +88,34 @@ class UserMethodTests(TestCase):
         self.assertTrue(superuser_test.is_active)
         self.assertTrue(superuser_test.is_admin)
 
+    def test_roles(self):
+        self.user.groups.add(Group.objects.get(name='Moderators'))
+        self.user.user_permissions.add(
+            Permission.objects.get(codename='add_contest'),
+            Permission.objects.get(codename='change_contest')
+        )
+        user = RushUser.objects.get(pk=self.user.pk)
+
+        with self.assertNumQueries(1):
+            self.assertTrue(user.is_moderator)
+            self.assertFalse(user.is_individual_contestant)
+            self.assertTrue(user.is_creator)
+            self.assertFalse(user.has_perm('contest.delete_contest'))
+        self.assertEqual(
+            user.get_all_permissions(),
+            {'contest.add_contest', 'contest.change_contest'} | {
+                'contest.{}'.format(codename)
+                for codename in Group.objects.get(
+                    name='Moderators'
+                ).permissions.values_list('codename', flat=True)
+            }
+        )
+
+        user.groups.add(Group.objects.get(name='Individual contestants'))
+        self.assertTrue(user.is_individual_contestant)
+        user.user_permissions.clear()
+        self.assertFalse(user.is_creator)
+
 
 class ContestTestCase(TestCase):
     fixtures = ['clubs.json', 'users.json']
@@ -169,14 +219,61 @@ class UnitModelsMixinTestCase(TestCase):
         contest = Contest.objects.first()
         self.assertEqual(
             contest.unit_name_select,
-            '<select id="id_unit" name="unit"><option value="2_school" >'
-            '[Szko\u0142a] Klub wodnika</option><br><option value="1_school" '
-            'selected>[Szko\u0142a] ZSP1 w Pile</option><option value="2_club"'
-            ' >[Klub] Klub wodnika</option><br><option value="1_club" >[Klub] '
-            'ZSP1 w Pile</option></select>'
+            '<select id="id_unit" name="unit" class="unit-autocomplete" '
+            'data-url="/administrator/jednostki"><option value="1_school" '
+            'selected>[Szko\u0142a] ZSP1 w Pile</option></select>'
         )
 
 
+class UnitNameTestCase(TestCase):
+
+    def setUp(self):
+        self.club = Club.objects.create(name='Klub')
+        self.user = RushUser.objects.create_user(
+            email='xyz@xyz.pl', username='user', unit=self.club
+        )
+        self.contest = Contest.objects.create(
+            date=timezone.now(), place='Szkoła', lowest_year=2000,
+            highest_year=2005, deadline=timezone.now(),
+            organizer=self.club
+        )
+
+    def test_unit_name(self):
+        self.assertEqual(self.user.unit_name, 'Klub')
+        self.assertEqual(self.contest.unit_name, 'Klub')
+
+        school = School.objects.create(name='Szkoła')
+        self.user.unit = school
+        self.user.save()
+        self.assertEqual(RushUser.objects.get().unit_name, 'Szkoła')
+
+        user = RushUser.objects.get()
+        with self.assertNumQueries(1):
+            user.save()
+
+    def test_unit_changes(self):
+        self.club.name = 'Wodnik'
+        self.club.save()
+        self.assertEqual(RushUser.objects.get().unit_name, 'Wodnik')
+        self.assertEqual(Contest.objects.get().unit_name, 'Wodnik')
+
+        self.club.delete()
+        self.assertIsNone(RushUser.objects.get().unit_name)
+        self.assertIsNone(Contest.objects.get().unit_name)
+
+    def test_prefetch_generic(self):
+        RushUser.objects.create_user(
+            email='abc@xyz.pl', username='user2',
+            unit=School.objects.create(name='Szkoła')
+        )
+
+        with self.assertNumQueries(3):
+            users = list(RushUser.objects.prefetch_generic('unit'))
+            self.assertEqual(
+                sorted(user.unit.name for user in users), ['Klub', 'Szkoła']
+            )
+
+
 class ContestantScoreTestCase(TestCase):
     fixtures = [
         'contestants.json', 'styles.json', 'contests.json',
@@ -195,6 +292,112 @@ class ContestantScoreTestCase(TestCase):
         )
 
 
+class EntryCountsTestCase(TestCase):
+    fixtures = ['styles.json', 'distances.json', 'contests.json', 'users.json']
+
+    def _get_counts(self, contest):
+        contest.refresh_from_db()
+        return contest.contestant_count, dict(
+            contest.style_entry_counts.values_list('style_id', 'count')
+        )
+
+    def test_counts(self):
+        contest, other_contest = Contest.objects.order_by('pk')[:2]
+        contestant = Contestant.objects.create(
+            moderator=RushUser.objects.first(), first_name='Adam',
+            last_name='Kowalski', gender='M', year_of_birth=2001, school='S',
+            contest=contest
+        )
+        ContestantScore.objects.create(
+            contestant=contestant, style_id=1, distance_id=1
+        )
+        score = ContestantScore.objects.create(
+            contestant=contestant, style_id=2, distance_id=2
+        )
+        self.assertEqual(self._get_counts(contest), (1, {1: 1, 2: 1}))
+
+        score = ContestantScore.objects.get(pk=score.pk)
+        score.style_id = 1
+        score.save()
+        self.assertEqual(self._get_counts(contest), (1, {1: 2, 2: 0}))
+
+        contestant = Contestant.objects.get(pk=contestant.pk)
+        contestant.contest = other_contest
+        contestant.save()
+        self.assertEqual(self._get_counts(contest), (0, {1: 0, 2: 0}))
+        self.assertEqual(self._get_counts(other_contest), (1, {1: 2}))
+
+        contestant.delete()
+        self.assertEqual(self._get_counts(other_contest), (0, {1: 0}))
+
+    def test_delete(self):
+        contest = Contest.objects.first()
+        contestants = [
+            Contestant.objects.create(
+                moderator=RushUser.objects.first(), first_name='Adam',
+                last_name='Kowalski', gender='M', year_of_birth=2001,
+                school='S', contest=contest
+            ) for _ in range(2)
+        ]
+        for contestant in contestants:
+            for style_id, distance_id in ((1, 1), (1, 2), (2, 1)):
+                ContestantScore.objects.create(
+                    contestant=contestant, style_id=style_id,
+                    distance_id=distance_id
+                )
+        self.assertEqual(self._get_counts(contest), (2, {1: 4, 2: 2}))
+
+        # Loading the contestant and its scores, three deletes, then one
+        # update of the contestant counter and one per style.
+        with self.assertNumQueries(8):
+            Contestant.objects.get(pk=contestants[0].pk).delete()
+        self.assertEqual(self._get_counts(contest), (1, {1: 2, 2: 1}))
+
+        with CaptureQueriesContext(connection) as queries:
+            Contest.objects.get(pk=contest.pk).delete()
+        self.assertFalse([
+            query for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE')
+        ])
+        self.assertFalse(StyleEntryCount.objects.exists())
+
+    def test_failed_delete(self):
+        contest = Contest.objects.first()
+        contestants = []
+        for _ in range(2):
+            contestant = Contestant.objects.create(
+                moderator=RushUser.objects.first(), first_name='Adam',
+                last_name='Kowalski', gender='M', year_of_birth=2001,
+                school='S', contest=contest
+            )
+            ContestantScore.objects.create(
+                contestant=contestant, style_id=1, distance_id=1
+            )
+            contestants.append(contestant)
+
+        delete_batch = DeleteQuery.delete_batch
+
+        def fail_on_contestants(query, pk_list, using):
+            if query.model is Contestant:
+                raise DatabaseError('Przerwane usuwanie')
+            return delete_batch(query, pk_list, using)
+
+        with patch.object(DeleteQuery, 'delete_batch', fail_on_contestants):
+            with self.assertRaises(DatabaseError):
+                with transaction.atomic():
+                    Contest.objects.get(pk=contest.pk).delete()
+        self.assertEqual(self._get_counts(contest), (2, {1: 2}))
+
+        ContestantScore.objects.get(contestant=contestants[0]).delete()
+        Contestant.objects.get(pk=contestants[1].pk).delete()
+        self.assertEqual(self._get_counts(contest), (1, {1: 0}))
+
+    def test_uncounted_rows(self):
+        contest = Contest.objects.first()
+        update_entry_counts(contest.pk, -1, {1: -1})
+        self.assertEqual(self._get_counts(contest), (0, {}))
+
+
 class ContestStyleDistancesTestCase(TestCase):
     fixtures = ['styles.json', 'distances.json']
 
@@ -209,3 +412,125 @@ class ContestStyleDistancesTestCase(TestCase):
             self.style.__unicode__(),
             'Dowolny: [<Distance: 25m>, <Distance: 50m>, <Distance: 100m>]'
         )
+
+    def test_signature(self):
+        distances = list(Distance.objects.all()[:3])
+        self.assertEqual(
+            self.style.signature,
+            '{}:{}'.format(
+                self.style.style_id,
+                ','.join(str(distance.pk) for distance in distances)
+            )
+        )
+
+        self.style.distances.remove(distances[1])
+        self.assertEqual(
+            self.style.signature,
+            '{}:{},{}'.format(
+                self.style.style_id, distances[0].pk, distances[2].pk
+            )
+        )
+
+    def test_get_or_create_many(self):
+        styles = list(Style.objects.all()[:2])
+        distances = list(Distance.objects.all()[:3])
+
+        with self.assertNumQueries(1):
+            contest_styles = ContestStyleDistances.objects.get_or_create_many(
+                [(styles[0], distances[::-1])]
+            )
+        self.assertEqual(contest_styles, [self.style])
+
+        contest_styles = ContestStyleDistances.objects.get_or_create_many([
+            (styles[0], distances), (styles[1], distances[:1]),
+            (styles[1], distances[:1]),
+        ])
+        self.assertEqual(contest_styles[0], self.style)
+        self.assertEqual(contest_styles[1], contest_styles[2])
+        self.assertEqual(
+            list(contest_styles[1].distances.all()), distances[:1]
+        )
+        self.assertEqual(ContestStyleDistances.objects.count(), 2)
+
+
+@override_settings(EMAIL_QUEUE_RETRY_DELAY=60, EMAIL_QUEUE_MAX_ATTEMPTS=2)
+class QueuedEmailTestCase(TestCase):
+    def setUp(self):
+        msg = EmailMessage(
+            'Temat', '<p>Treść</p>', 'rush@rush.pl', ['a@a.pl', 'b@b.pl'],
+            bcc=['c@c.pl']
+        )
+        msg.content_subtype = 'html'
+        self.queued_email = QueuedEmail.objects.enqueue(msg)
+
+    def test_send_queued(self):
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(QueuedEmail.objects.send_queued(), (1, 0))
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['a@a.pl', 'b@b.pl'])
+        self.assertEqual(mail.outbox[0].bcc, ['c@c.pl'])
+        self.assertEqual(mail.outbox[0].body, '<p>Treść</p>')
+        self.assertEqual(mail.outbox[0].content_subtype, 'html')
+
+        self.assertEqual(QueuedEmail.objects.send_queued(), (0, 0))
+        self.assertIsNotNone(QueuedEmail.objects.get().sent)
+
+    @patch(
+        'django.core.mail.backends.locmem.EmailBackend.send_messages',
+        side_effect=IOError('Connection refused')
+    )
+    def test_retry(self, send_messages):
+        self.assertEqual(QueuedEmail.objects.send_queued(), (0, 1))
+
+        queued_email = QueuedEmail.objects.get()
+        self.assertEqual(queued_email.attempts, 1)
+        self.assertIn('Connection refused', queued_email.last_error)
+        self.assertGreater(
+            queued_email.send_after, timezone.now() + timedelta(seconds=50)
+        )
+        self.assertEqual(QueuedEmail.objects.send_queued(), (0, 0))
+
+        QueuedEmail.objects.update(send_after=timezone.now())
+        self.assertEqual(QueuedEmail.objects.send_queued(), (0, 1))
+        queued_email = QueuedEmail.objects.get()
+        self.assertGreater(
+            queued_email.send_after, timezone.now() + timedelta(seconds=110)
+        )
+
+        QueuedEmail.objects.update(send_after=timezone.now())
+        self.assertFalse(QueuedEmail.objects.due().exists())
+
+    def test_send_queued_interrupted(self):
+        QueuedEmail.objects.enqueue(EmailMessage('Drugi', 'Treść'))
+        with patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages',
+            side_effect=[1, KeyboardInterrupt]
+        ):
+            with self.assertRaises(KeyboardInterrupt):
+                QueuedEmail.objects.send_queued()
+
+        first, second = QueuedEmail.objects.order_by('pk')
+        self.assertIsNotNone(first.sent)
+        self.assertIsNone(second.sent)
+        self.assertFalse(QueuedEmail.objects.due().exists())
+
+        QueuedEmail.objects.update(send_after=timezone.now())
+        self.assertEqual(QueuedEmail.objects.send_queued(), (1, 0))
+        self.assertEqual(mail.outbox[0].subject, 'Drugi')
+
+    def test_enqueue_in_chunks(self):
+        msg = EmailMessage('Nowe zawody', 'Treść', 'rush@rush.pl')
+        recipients = iter(
+            ['{}@rush.pl'.format(i) for i in xrange(5)]
+        )
+        with self.settings(EMAIL_QUEUE_BATCH_SIZE=2):
+            count = QueuedEmail.objects.enqueue_in_chunks(msg, recipients, 2)
+        self.assertEqual(count, 3)
+
+        self.assertEqual(QueuedEmail.objects.send_queued(10), (4, 0))
+        self.assertEqual(
+            [sent_mail.bcc for sent_mail in mail.outbox[1:]],
+            [['0@rush.pl', '1@rush.pl'], ['2@rush.pl', '3@rush.pl'],
+             ['4@rush.pl']]
+        )
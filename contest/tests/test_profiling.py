@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import logging
+
+from django.core.urlresolvers import reverse
+from django.test import (
+    TestCase,
+    override_settings,
+)
+from mock import patch
+
+from contest.models import RushUser
+from contest.profiling import (
+    QueryRecorder,
+    fingerprint,
+    get_duplicates,
+)
+
+
+class ProfilingTestCase(TestCase):
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            fingerprint(
+                "SELECT * FROM t WHERE a = 'x''y' AND b = 1.5 AND c IN (1, 2)"
+            ),
+            'SELECT * FROM t WHERE a = ? AND b = ? AND c IN (...)'
+        )
+
+    def test_get_duplicates(self):
+        with QueryRecorder() as recorder:
+            for pk in xrange(3):
+                list(RushUser.objects.filter(pk=pk))
+            RushUser.objects.count()
+
+        self.assertEqual(len(recorder.queries), 4)
+        duplicates = get_duplicates(recorder.queries)
+        self.assertEqual(len(duplicates), 1)
+        self.assertEqual(duplicates[0][1], 3)
+
+
+class QueryProfilingMiddlewareTestCase(TestCase):
+
+    def test_disabled(self):
+        response = self.client.get(reverse('contest:home'))
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(QUERY_PROFILING=True, QUERY_BUDGET=0)
+    @patch('contest.middleware.logger')
+    def test_enabled(self, logger):
+        RushUser.objects.create_superuser(
+            email='auth@user.pl', username='auth', password='password123'
+        )
+        self.client.login(username='auth', password='password123')
+        response = self.client.get(reverse('contest:home'))
+
+        self.assertRegexpMatches(
+            response['Server-Timing'],
+            r'^sql;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+, '
+            r'dup;desc="\d+ duplicated", total;dur=[\d.]+$'
+        )
+        args, kwargs = logger.log.call_args
+        profile = kwargs['extra']['profile']
+        self.assertEqual(args[0], logging.WARNING)
+        self.assertEqual(profile['path'], reverse('contest:home'))
+        self.assertEqual(profile['status'], 200)
+        self.assertGreater(profile['queries'], 0)
+        self.assertGreater(profile['template_time'], 0)
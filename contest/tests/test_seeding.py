@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+from datetime import datetime
+
+from django.core.urlresolvers import reverse
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+)
+from django.utils.timezone import make_aware
+
+from contest.models import (
+    Contest,
+    Contestant,
+    ContestantScore,
+    Distance,
+    RushUser,
+    Style,
+)
+from contest.seeding import (
+    Entry,
+    get_heat_sizes,
+    get_lane_order,
+    seed_circle,
+    seed_events,
+    seed_timed_final,
+)
+
+
+def _get_entries(count):
+    return [Entry(pk, 'Adam', 'Nowak', 30000 + pk) for pk in xrange(count)]
+
+
+def _get_ids(heats):
+    return [[entry.contestant_id for _, entry in heat] for heat in heats]
+
+
+class SeedingTestCase(SimpleTestCase):
+
+    def test_get_lane_order(self):
+        self.assertEqual(get_lane_order(6), [3, 4, 2, 5, 1, 6])
+        self.assertEqual(get_lane_order(8), [4, 5, 3, 6, 2, 7, 1, 8])
+        self.assertEqual(get_lane_order(5), [3, 4, 2, 5, 1])
+
+    def test_get_heat_sizes(self):
+        self.assertEqual(get_heat_sizes(0, 6), [])
+        self.assertEqual(get_heat_sizes(2, 6), [2])
+        self.assertEqual(get_heat_sizes(12, 6), [6, 6])
+        self.assertEqual(get_heat_sizes(13, 6), [3, 4, 6])
+        self.assertEqual(get_heat_sizes(16, 6), [4, 6, 6])
+
+    def test_seed_timed_final(self):
+        heats = seed_timed_final(_get_entries(8), 6)
+
+        self.assertEqual(_get_ids(heats), [[7, 5, 6], [4, 2, 0, 1, 3]])
+        self.assertEqual([lane for lane, _ in heats[1]], [1, 2, 3, 4, 5])
+
+    def test_seed_circle(self):
+        heats = seed_circle(_get_entries(20), 6)
+
+        self.assertEqual(
+            _get_ids(heats),
+            [
+                [19, 17, 18],
+                [14, 8, 2, 5, 11],
+                [13, 7, 1, 4, 10, 16],
+                [12, 6, 0, 3, 9, 15],
+            ]
+        )
+
+    def test_seed_circle_with_uneven_heats(self):
+        heats = seed_circle(_get_entries(7), 6)
+
+        self.assertEqual(_get_ids(heats), [[5, 1, 3], [4, 0, 2, 6]])
+
+    def test_seed_events(self):
+        rows = [
+            (1, 2, 'F', 2002, 1, 'Ala', 'Kot', 30000),
+            (1, 2, 'F', 2005, 2, 'Ola', 'Kot', 31000),
+            (1, 2, 'F', 2003, 3, 'Ela', 'Kot', None),
+            (1, 2, 'M', 2003, 4, 'Jan', 'Kot', 29000),
+        ]
+
+        events = seed_events(rows, 6, 2)
+
+        self.assertEqual(
+            [
+                (event.gender, event.years, _get_ids(event.heats))
+                for event in events
+            ],
+            [
+                ('F', (2002, 2003), [[1, 3]]),
+                ('F', (2004, 2005), [[2]]),
+                ('M', (2002, 2003), [[4]]),
+            ]
+        )
+
+
+class SeedingViewTestCase(TestCase):
+
+    def setUp(self):
+        self.admin = RushUser.objects.create_superuser(
+            email='xyz@xyz.pl', username='admin', password='Password'
+        )
+        self.contest = Contest.objects.create(
+            date=make_aware(datetime(2008, 12, 31)),
+            place='Szkoła', lowest_year=1997, highest_year=2000,
+            description='Opis', deadline=make_aware(datetime(2008, 11, 20)),
+            created_by=self.admin
+        )
+        style = Style.objects.first()
+        distance = Distance.objects.first()
+        for time_result in (31000, None, 30000, 32000):
+            contestant = Contestant.objects.create(
+                moderator=self.admin, first_name='Adam', last_name='Nowak',
+                gender='M', year_of_birth=2002, school='S',
+                contest=self.contest
+            )
+            ContestantScore.objects.create(
+                contestant=contestant, style=style, distance=distance,
+                time_result=time_result
+            )
+        self.client.login(username='admin', password='Password')
+
+    def test_get(self):
+        url = reverse(
+            'contest:contest-seeding', kwargs={'contest_id': self.contest.id}
+        )
+        self.client.get(url)
+
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        event = response.context['events'][0]
+        self.assertEqual(event['gender'], 'Mężczyzna')
+        self.assertEqual(
+            [
+                (lane, entry.get_time_result())
+                for lane, entry in event['heats'][0]
+            ],
+            [(2, '00:32.00'), (3, '00:30.00'), (4, '00:31.00'), (5, '')]
+        )
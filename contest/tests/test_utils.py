@@ -11,19 +11,11 @@ from contest.utils import AdminUtils
 class UnitAdminMixinTestCase(TestCase):
     fixtures = ['contest/fixtures/schools.json']
 
-    def test_get_options(self):
-        active_content_type = ContentType.objects.get_for_model(School)
-        options = AdminUtils.get_options(
-            School, 'Szkoła', 1, active_content_type
-        )
+    def test_get_option(self):
         self.assertEqual(
-            options,
-            [
-                '<option value="2_school" >'
-                '[Szko\u0142a] Klub wodnika</option>',
-                '<option value="1_school" selected>'
-                '[Szko\u0142a] ZSP1 w Pile</option>'
-            ]
+            AdminUtils.get_option(School.objects.get(pk=1)),
+            '<option value="1_school" selected>'
+            '[Szko\u0142a] ZSP1 w Pile</option>'
         )
 
     def test_get_unit_id_and_type(self):
@@ -3,7 +3,10 @@ from __future__ import unicode_literals
 from datetime import (
     date,
     datetime,
+    timedelta,
 )
+from io import BytesIO
+from zipfile import ZipFile
 
 from django.conf import settings
 from django.contrib.auth import authenticate
@@ -16,13 +19,18 @@ from django.contrib.contenttypes.models import ContentType
 from django.core import mail
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.urlresolvers import reverse
-from django.test import TestCase
+from django.test import (
+    TestCase,
+    override_settings,
+)
 from django.test.client import RequestFactory
 from django.utils.timezone import make_aware
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
 from mock import patch
 
+from contest.catalog import catalog
+from contest.fragments import _get_timeout
 from contest.forms import (
     ContestantForm,
     ContestForm,
@@ -37,12 +45,16 @@ from contest.models import (
     Club,
     Contest,
     Contestant,
+    ContestResult,
+    QueuedEmail,
     RushUser,
+    School,
     ContestantScore,
     Style,
     Distance,
     ContestStyleDistances
 )
+from contest.tests.utils import QueryBudgetMixin
 from contest.views import (
     RegisterView,
     SetResetPasswordView,
@@ -79,10 +91,73 @@ class HomeViewTests(TestCase):
     def test_context(self):
         self.assertEqual(len(self.response.context['completed']), 1)
         self.assertEqual(len(self.response.context['upcoming']), 1)
-        self.assertTrue(
-            isinstance(self.response.context['completed'][0], Contest)
+        self.assertTrue(isinstance(
+            self.response.context['completed'][0]['contest'], Contest
+        ))
+        self.assertEqual(self.response.context['manageable'], set())
+
+    def test_cached_fragments(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('contest:home'))
+        self.assertContains(response, 'Dodaj zawodników', count=1)
+
+        self.contest_done.created_by = self.user
+        self.contest_done.place = 'Basen'
+        self.contest_done.save()
+        response = self.client.get(reverse('contest:home'))
+
+        self.assertContains(response, 'Basen - ')
+        self.assertContains(response, 'Dodaj wyniki')
+        self.assertEqual(
+            response.context['manageable'], {self.contest_done.pk}
         )
 
+    def test_timeout(self):
+        now = make_aware(datetime(2048, 11, 20)) - timedelta(seconds=90.5)
+        self.assertEqual(_get_timeout([self.contest], now), 91)
+        self.assertEqual(_get_timeout([], now), settings.HOME_CACHE_TIMEOUT)
+
+
+class CompletedContestsViewTests(TestCase):
+
+    def setUp(self):
+        self.contests = [
+            Contest.objects.create(
+                date=make_aware(date), place='Szkoła', lowest_year=2000,
+                highest_year=2005, description='Opis',
+                deadline=make_aware(datetime(2008, 11, 20))
+            ) for date in (
+                datetime(2008, 12, 31), datetime(2009, 12, 31),
+                datetime(2009, 12, 31)
+            )
+        ]
+
+    @override_settings(COMPLETED_CONTESTS_PAGE_SIZE=2)
+    def test_load_more(self):
+        response = self.client.get(reverse('contest:home'))
+        self.assertEqual(
+            [item['contest'] for item in response.context['completed']],
+            [self.contests[2], self.contests[1]]
+        )
+
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse('contest:completed-contests'),
+                {'kursor': response.context['next_cursor']}
+            )
+        self.assertEqual(
+            [item['contest'] for item in response.context['completed']],
+            [self.contests[0]]
+        )
+        self.assertIsNone(response.context['next_cursor'])
+        self.assertNotContains(response, 'Pokaż więcej')
+
+    def test_invalid_cursor(self):
+        response = self.client.get(
+            reverse('contest:completed-contests'), {'kursor': 'abc'}
+        )
+        self.assertEqual(response.status_code, 400)
+
 
 class LoginViewTests(TestCase):
     def setUp(self):
@@ -345,6 +420,7 @@ class SetResetPasswordViewTestCase(TestCase):
         RegisterView.send_email_with_new_user(
             'Janek', 'Kowalski', ['admin@admin.pl'], 'www.rush.pl'
         )
+        QueuedEmail.objects.send_queued()
         self.assertEqual(len(mail.outbox), 1)
         self.assertEqual(mail.outbox[0].to, ['admin@admin.pl'])
 
@@ -495,6 +571,19 @@ class AccountsViewTestCase(TestCase):
         self.assertEqual(len(response.context['users']), 1)
         self.assertEqual(response.context['users'][0], inactive_user)
 
+    @override_settings(ACCOUNTS_PAGE_SIZE=1)
+    def test_get_paginated(self):
+        users = [
+            RushUser.objects.create_user(
+                email='inactive{}@user.pl'.format(i),
+                username='inactive{}'.format(i)
+            ) for i in xrange(2)
+        ]
+
+        response = self.client.get(reverse('contest:accounts'), {'page': 2})
+        self.assertEqual(list(response.context['users']), [users[1]])
+        self.assertEqual(response.context['users'].paginator.num_pages, 2)
+
     def test_post(self):
         user = RushUser(
             email='test@user.pl', first_name='Test', last_name='Anonymous',
@@ -529,6 +618,7 @@ class AccountsViewTestCase(TestCase):
         )
         self.assertFalse(RushUser.objects.filter(pk=user.id).exists())
         self.assertEqual(response.status_code, 204)
+        QueuedEmail.objects.send_queued()
         self.assertEqual(mail.outbox[0].to, [user.email])
 
         response = self.client.delete(
@@ -537,6 +627,136 @@ class AccountsViewTestCase(TestCase):
         self.assertEqual(response.status_code, 500)
 
 
+class AccountsBatchViewTestCase(TestCase):
+    def setUp(self):
+        RushUser.objects.create_superuser(
+            email='auth@user.pl', username='auth', password='password123'
+        )
+        self.users = [
+            RushUser.objects.create_user(
+                email='user{}@user.pl'.format(i), first_name='Test',
+                last_name='Anonymous', username='user{}'.format(i)
+            ) for i in xrange(3)
+        ]
+        self.active_user = RushUser.objects.create_user(
+            email='active@user.pl', username='active', is_active=True
+        )
+        self.client.login(username='auth', password='password123')
+
+    def _post(self, action, user_ids):
+        return self.client.post(
+            reverse('contest:accounts-batch'),
+            {'action': action, 'users': user_ids}
+        )
+
+    def test_create(self):
+        user_ids = [user.pk for user in self.users]
+        with self.assertNumQueries(8):
+            response = self._post(
+                'create', user_ids + [self.active_user.pk, 0]
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['users'], [
+            {'id': 0, 'status': 'missing'},
+        ] + [
+            {'id': pk, 'status': 'done'} for pk in user_ids
+        ] + [
+            {'id': self.active_user.pk, 'status': 'active'},
+        ])
+        self.assertFalse(
+            RushUser.objects.filter(pk__in=user_ids, is_active=False).exists()
+        )
+        QueuedEmail.objects.send_queued()
+        self.assertEqual(
+            sorted(msg.to[0] for msg in mail.outbox),
+            [user.email for user in self.users]
+        )
+        self.assertEqual(mail.outbox[0].subject, 'Rush - ustawienie hasła')
+
+    def test_discard(self):
+        response = self._post(
+            'discard', [self.users[0].pk, self.active_user.pk]
+        )
+
+        self.assertEqual(response.json()['users'], [
+            {'id': self.users[0].pk, 'status': 'done'},
+            {'id': self.active_user.pk, 'status': 'active'},
+        ])
+        self.assertFalse(RushUser.objects.filter(pk=self.users[0].pk).exists())
+        QueuedEmail.objects.send_queued()
+        self.assertEqual(mail.outbox[0].to, [self.users[0].email])
+        self.assertEqual(mail.outbox[0].subject, 'Podanie o konto odrzucone')
+
+    def test_invalid(self):
+        self.assertEqual(self._post('create', []).status_code, 400)
+        self.assertEqual(self._post('create', ['x']).status_code, 400)
+        self.assertEqual(
+            self._post('remove', [self.users[0].pk]).status_code, 400
+        )
+
+
+@override_settings(UNIT_SEARCH_PAGE_SIZE=2)
+class UnitSearchViewTestCase(TestCase):
+    def setUp(self):
+        RushUser.objects.create_superuser(
+            email='auth@user.pl', username='auth', password='password123'
+        )
+        RushUser.objects.create_user(
+            email='cc@aa.bbb', username='normal_user', password='password123',
+            is_active=True
+        )
+        self.club = Club.objects.create(name='Delfin')
+        self.school = School.objects.create(name='Dwójka')
+        School.objects.create(name='Orlik')
+        Club.objects.create(name='Dąb')
+        self.client.login(username='auth', password='password123')
+
+    def test_get_forbidden(self):
+        self.client.login(username='normal_user', password='password123')
+        response = self.client.get(reverse('contest:unit-search'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_get(self):
+        response = self.client.get(reverse('contest:unit-search'), {'q': 'd'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'results': [
+                {
+                    'id': '{}_club'.format(self.club.pk),
+                    'text': '[Klub] Delfin'
+                },
+                {
+                    'id': '{}_school'.format(self.school.pk),
+                    'text': '[Szkoła] Dwójka'
+                },
+            ],
+            'more': True,
+        })
+
+        response = self.client.get(
+            reverse('contest:unit-search'), {'q': 'D', 'strona': 2}
+        )
+        self.assertEqual(response.json()['more'], False)
+        self.assertEqual(
+            [unit['text'] for unit in response.json()['results']],
+            ['[Klub] Dąb']
+        )
+
+    @override_settings(UNIT_SEARCH_PAGE_SIZE=1)
+    def test_get_pages(self):
+        texts = []
+        for page in range(1, 5):
+            response = self.client.get(
+                reverse('contest:unit-search'), {'q': 'd', 'strona': page}
+            )
+            texts.extend(unit['text'] for unit in response.json()['results'])
+            self.assertEqual(response.json()['more'], page < 3)
+        self.assertEqual(
+            texts, ['[Klub] Delfin', '[Szkoła] Dwójka', '[Klub] Dąb']
+        )
+
+
 class CancelNotificationsViewTests(TestCase):
     def test_get(self):
         user = RushUser.objects.create(
@@ -782,6 +1002,59 @@ class ContestantAddViewTestCase(TestCase):
 
         self.assertEqual(contestants[0].first_name, 'Jan')
         self.assertEqual(contestants[1].first_name, 'Anna')
+        self.assertEqual(
+            [
+                score.__unicode__()
+                for score in contestants[1].contestantscore_set.all()
+            ],
+            [
+                'Anna Nowak: Dowolny 50m - 02:11.11s',
+                'Anna Nowak: Motylkowy 200m - 00:00.00s',
+            ]
+        )
+
+    def test_post_query_count(self):
+        """
+        Number of queries doesn't depend on a number of forms.
+        """
+        url = reverse(
+            'contest:contestant-add', kwargs={'contest_id': self.contest.id}
+        )
+
+        def get_form_data(total_forms):
+            form_data = {
+                'form-INITIAL_FORMS': '0',
+                'form-MAX_NUM_FORMS': '1000',
+                'form-MIN_NUM_FORMS': '0',
+                'form-TOTAL_FORMS': str(total_forms),
+            }
+            for i in xrange(total_forms):
+                form_data.update({
+                    'form-{}-year_of_birth'.format(i): '2003',
+                    'form-{}-first_name'.format(i): 'Jan',
+                    'form-{}-last_name'.format(i): 'Kowalski',
+                    'form-{}-gender'.format(i): 'M',
+                    'form-{}-school'.format(i): 'P',
+                    'form-{}-styles'.format(i): (
+                        'Dowolny,25m,00:39.11;Motylkowy,50m,01:00.00'
+                    ),
+                })
+            return form_data
+
+        self.client.post(url, data=get_form_data(1))
+
+        with self.assertNumQueries(15):
+            self.client.post(url, data=get_form_data(2))
+        with self.assertNumQueries(15):
+            self.client.post(url, data=get_form_data(20))
+
+        self.assertEqual(Contestant.objects.count(), 23)
+        self.assertEqual(ContestantScore.objects.count(), 46)
+        self.contest.refresh_from_db()
+        self.assertEqual(self.contest.contestant_count, 23)
+        self.assertEqual(sorted(
+            self.contest.style_entry_counts.values_list('count', flat=True)
+        ), [23, 23])
 
     def test_post_already_signed_in(self):
         individual_user = RushUser(
@@ -889,7 +1162,7 @@ class ContestantAddViewTestCase(TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertIsInstance(form, ContestantForm)
-        self.assertEqual(form.fields['organization'].initial, club)
+        self.assertEqual(form.fields['organization'].initial, club.name)
 
     def test_post_with_validation_error(self):
         response = self.client.post(
@@ -946,7 +1219,7 @@ class ContestantAddViewTestCase(TestCase):
         )
 
 
-class ContestantListViewTestCase(TestCase):
+class ContestantListViewTestCase(QueryBudgetMixin, TestCase):
 
     def setUp(self):
         self.user = RushUser(
@@ -973,17 +1246,30 @@ class ContestantListViewTestCase(TestCase):
         )
 
     def test_get(self):
+        with self.assertQueryBudget(6):
+            response = self.client.get(
+                reverse(
+                    'contest:contestant-list',
+                    kwargs={'contest_id': self.contest.id}
+                )
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['contestants']), 1)
+
+    def test_get_uncounted_contestants(self):
+        # E.g. contestants loaded from fixtures aren't counted.
+        Contest.objects.update(contestant_count=0)
         response = self.client.get(
             reverse(
                 'contest:contestant-list',
                 kwargs={'contest_id': self.contest.id}
             )
         )
-        self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response.context['contestants']), 1)
+        self.assertEqual(response.context['msg'], '')
 
 
-class EditContestantViewTestCase(TestCase):
+class EditContestantViewTestCase(QueryBudgetMixin, TestCase):
     fixtures = [
         'contests.json', 'clubs.json', 'users.json', 'styles.json',
         'distances.json'
@@ -1013,12 +1299,13 @@ class EditContestantViewTestCase(TestCase):
         self.client.login(username='root', password='R@ootroot')
 
     def test_get(self):
-        response = self.client.get(
-            reverse(
-                'contest:contestant-edit',
-                kwargs={'contestant_id': self.contestant.id}
-            ),
-        )
+        with self.assertQueryBudget(8):
+            response = self.client.get(
+                reverse(
+                    'contest:contestant-edit',
+                    kwargs={'contestant_id': self.contestant.id}
+                ),
+            )
         self.assertEqual(response.status_code, 200)
         self.assertEqual(
             response.context['form'].initial['first_name'], 'Adam'
@@ -1057,6 +1344,8 @@ class EditContestantViewTestCase(TestCase):
 
 
 class ContestResultsViewTestCase(TestCase):
+    fixtures = ['styles.json', 'distances.json']
+
     def setUp(self):
         self.contest = Contest.objects.create(
             date=make_aware(datetime(2008, 12, 31)),
@@ -1114,8 +1403,43 @@ class ContestResultsViewTestCase(TestCase):
             self.contest.results
         )
 
+    @override_settings(RESULTS_PAGE_SIZE=3)
+    def test_get_structured_results(self):
+        style = Style.objects.get(pk=1)
+        distances = list(
+            Distance.objects.filter(pk__in=[1, 2]).order_by('pk')
+        )
+        for i in xrange(4):
+            contestant = Contestant.objects.create(
+                first_name='Adam', last_name='Nowak', gender='M',
+                year_of_birth=2002, school='P', contest=self.contest2,
+                moderator=self.user
+            )
+            for distance in distances:
+                ContestResult.objects.create(
+                    contest=self.contest2, contestant=contestant, style=style,
+                    distance=distance, place=4 - i, time_result=15000 + i
+                )
+        url = reverse(
+            'contest:contest-results', kwargs={'contest_id': self.contest2.id}
+        )
+
+        with self.assertNumQueries(5):
+            response = self.client.get(url, {'page': 2})
+
+        self.assertEqual(response.context['msg'], '')
+        self.assertEqual(response.context['page'].paginator.num_pages, 3)
+        events = response.context['events']
+        self.assertEqual(
+            [(event, [r.place for r in results])
+             for event, results in events],
+            [((style, distances[0]), [4]), ((style, distances[1]), [1, 2])]
+        )
+
 
 class AddContestResultsViewTest(TestCase):
+    fixtures = ['styles.json', 'distances.json']
+
     def setUp(self):
         self.admin = RushUser.objects.create_superuser(
             email='xyz@xyz.pl', username='admin', password='Password'
@@ -1134,6 +1458,9 @@ class AddContestResultsViewTest(TestCase):
         self.user.set_password('useruser123')
         self.user.save()
 
+    def tearDown(self):
+        catalog.invalidate()
+
     def test_has_not_access(self):
         self.client.login(username='user', password='useruser123')
         response = self.client.get(
@@ -1194,8 +1521,71 @@ class AddContestResultsViewTest(TestCase):
         contest = Contest.objects.get(pk=self.contest.id)
         self.assertEqual(contest.results, 'Wyniki')
 
+    def _import_results(self, content):
+        self.client.login(username='admin', password='Password')
+        return self.client.post(
+            reverse(
+                'contest:contest-add-results',
+                kwargs={'contest_id': self.contest.id}
+            ),
+            data={
+                'results_file': SimpleUploadedFile(
+                    'wyniki.csv', content.encode('utf-8')
+                ),
+            }
+        )
 
-class ManageContestViewTestCase(TestCase):
+    def test_import_results(self):
+        contestant = Contestant.objects.create(
+            first_name='Adam', last_name='Nowak', gender='M',
+            year_of_birth=2002, school='P', contest=self.contest,
+            moderator=self.admin
+        )
+        ContestResult.objects.create(
+            contest=self.contest, contestant=contestant, place=9,
+            style=Style.objects.get(pk=1), distance=Distance.objects.get(pk=1)
+        )
+        content = '{0},Dowolny,25m,1,00:15.20\n{0},Grzbietowy,50m,2,\n'
+        response = self._import_results(content.format(contestant.pk))
+
+        self.assertEqual(response.status_code, 302)
+        results = ContestResult.objects.filter(
+            contest=self.contest
+        ).order_by('place')
+        self.assertEqual(
+            [(r.style.name, r.distance.value, r.place, r.time_result)
+             for r in results],
+            [('Dowolny', '25m', 1, 15200), ('Grzbietowy', '50m', 2, None)]
+        )
+
+    def test_import_results_with_errors(self):
+        response = self._import_results('1,Dowolny,25m,1,00:15.20\n')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.context['import_form'].errors['results_file'],
+            ['Wiersz 1: zawodnik nie bierze udziału w zawodach']
+        )
+        self.assertFalse(ContestResult.objects.exists())
+
+    def test_import_duplicated_results(self):
+        contestant = Contestant.objects.create(
+            first_name='Adam', last_name='Nowak', gender='M',
+            year_of_birth=2002, school='P', contest=self.contest,
+            moderator=self.admin
+        )
+        content = '{0},Dowolny,25m,1,00:15.20\n{0},Dowolny,25m,2,\n'
+        response = self._import_results(content.format(contestant.pk))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.context['import_form'].errors['results_file'],
+            ['Wiersz 2: powtórzony wynik zawodnika w tej konkurencji']
+        )
+        self.assertFalse(ContestResult.objects.exists())
+
+
+class ManageContestViewTestCase(QueryBudgetMixin, TestCase):
     fixtures = [
         'contest_style_distances.json',
     ]
@@ -1229,19 +1619,37 @@ class ManageContestViewTestCase(TestCase):
             response.context['msg'],
             'Zawodnicy nie zostali jeszcze dodani.'
         )
+        self.assertEqual(response.context['style_entry_counts'], [])
 
-    def test_get_contestants(self):
-        self.contestant = Contestant.objects.create(
+    def test_get_uncounted_contestants(self):
+        Contestant.objects.create(
             moderator=self.admin, first_name='Adam', last_name='Nowak',
             gender='M', year_of_birth=2002, school='S', contest=self.contest
         )
-        self.contestants = [self.contestant]
+        # E.g. contestants loaded from fixtures aren't counted.
+        Contest.objects.update(contestant_count=0)
         response = self.client.get(
             reverse(
                 'contest:contest-manage',
                 kwargs={'contest_id': self.contest.id}
             ),
         )
+        self.assertEqual(response.context['contestant_count'], 1)
+        self.assertContains(response, 'Liczba zawodników: 1')
+
+    def test_get_contestants(self):
+        self.contestant = Contestant.objects.create(
+            moderator=self.admin, first_name='Adam', last_name='Nowak',
+            gender='M', year_of_birth=2002, school='S', contest=self.contest
+        )
+        self.contestants = [self.contestant]
+        with self.assertQueryBudget(5):
+            response = self.client.get(
+                reverse(
+                    'contest:contest-manage',
+                    kwargs={'contest_id': self.contest.id}
+                ),
+            )
         self.assertEqual(response.status_code, 200)
         self.assertEqual(
             response.context['contestants'][0],
@@ -1253,6 +1661,84 @@ class ManageContestViewTestCase(TestCase):
         )
 
 
+class StartListExportViewTestCase(TestCase):
+    def setUp(self):
+        self.admin = RushUser.objects.create_superuser(
+            email='xyz@xyz.pl', username='admin', password='Password'
+        )
+        self.contest = Contest.objects.create(
+            date=make_aware(datetime(2008, 12, 31)),
+            place='Szkoła', lowest_year=1997, highest_year=2000,
+            description='Opis', deadline=make_aware(datetime(2008, 11, 20)),
+            created_by=self.admin
+        )
+        self.style = Style.objects.first()
+        self.distance = Distance.objects.first()
+        for last_name, time_result in (('Nowak', 31120), ('Łęcki', 30050)):
+            contestant = Contestant.objects.create(
+                moderator=self.admin, first_name='Adam', last_name=last_name,
+                gender='M', year_of_birth=2002, school='S',
+                contest=self.contest
+            )
+            ContestantScore.objects.create(
+                contestant=contestant, style=self.style,
+                distance=self.distance, time_result=time_result
+            )
+        self.client.login(username='admin', password='Password')
+
+    def _get_start_list(self, export_format):
+        return self.client.get(
+            reverse(
+                'contest:contest-start-list',
+                kwargs={
+                    'contest_id': self.contest.id,
+                    'export_format': export_format,
+                }
+            )
+        )
+
+    def test_csv(self):
+        response = self._get_start_list('csv')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response['Content-Disposition'],
+            'attachment; filename="lista_startowa_{}.csv"'.format(
+                self.contest.pk
+            )
+        )
+        lines = b''.join(response.streaming_content).decode('utf-8')
+        self.assertEqual(
+            lines.splitlines()[1:],
+            [
+                '{},{},Łęcki,Adam,Mężczyzna,2002,Szkoła średnia,00:30.05'
+                .format(self.style.name, self.distance.value),
+                '{},{},Nowak,Adam,Mężczyzna,2002,Szkoła średnia,00:31.12'
+                .format(self.style.name, self.distance.value),
+            ]
+        )
+
+    def test_xlsx(self):
+        response = self._get_start_list('xlsx')
+
+        self.assertEqual(response.status_code, 200)
+        workbook = ZipFile(BytesIO(b''.join(response.streaming_content)))
+        content = b''.join(workbook.read(name) for name in workbook.namelist())
+        self.assertIn('Łęcki'.encode('utf-8'), content)
+
+    def test_has_not_access(self):
+        user = RushUser(
+            email='root@root.pl', username='user', is_active=True
+        )
+        user.set_password('useruser123')
+        user.save()
+        self.client.login(username='user', password='useruser123')
+
+        response = self._get_start_list('csv')
+
+        self.assertEqual(response.status_code, 302)
+
+
 class ContestEditViewTestCase(TestCase):
     fixtures = [
         'contest_style_distances.json',
@@ -1398,6 +1884,7 @@ class ContestAddTestCase(TestCase):
             contest[0].styles.last().__unicode__(),
             'Zmienny: [<Distance: 100m>]'
         )
+        self.assertEqual(QueuedEmail.objects.get().bcc, 'd@d.pl')
 
     def test_post_errors(self):
         self.client.login(username='right', password='pass12')
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+from contextlib import contextmanager
+
+from django.core.signals import request_started
+from django.db import reset_queries
+
+from contest.profiling import (
+    QueryRecorder,
+    get_duplicates,
+)
+
+
+class QueryBudgetMixin(object):
+    """
+    Test case mixin checking how many queries a block of code executes.
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, budget, duplicates=False):
+        """
+        Fails if the block executes more than `budget` queries or, unless
+        `duplicates` is set, any query more than once.
+        """
+        # Test client requests would clear queries recorded so far.
+        request_started.disconnect(reset_queries)
+        try:
+            with QueryRecorder() as recorder:
+                yield recorder
+        finally:
+            request_started.connect(reset_queries)
+
+        queries = recorder.queries
+        report = '\n'.join(
+            '{}. {}'.format(i, query['sql'])
+            for i, query in enumerate(queries, start=1)
+        )
+        self.assertLessEqual(len(queries), budget, (
+            '{} queries executed, {} allowed:\n{}'.format(
+                len(queries), budget, report
+            )
+        ))
+        if not duplicates:
+            repeated = get_duplicates(queries)
+            self.assertFalse(repeated, 'Duplicated queries:\n{}'.format(
+                '\n'.join(
+                    '{}x {}'.format(count, sql) for sql, count in repeated
+                )
+            ))
@@ -60,11 +60,21 @@ urlpatterns = [
         include(auth_patterns),
         name='auth'
     ),
+    url(
+        r'^administrator/konta/zbiorczo/?$',
+        login_required(views.AccountsBatchView.as_view()),
+        name='accounts-batch'
+    ),
     url(
         r'^administrator/konta/(?P<user_id>[0-9]+)?/?$',
         login_required(views.AccountsView.as_view()),
         name='accounts'
     ),
+    url(
+        r'^administrator/jednostki/?$',
+        login_required(views.UnitSearchView.as_view()),
+        name='unit-search'
+    ),
     url(
         r'^anuluj_powiadomienia/?$',
         login_required(views.CancelNotificationsView.as_view()),
@@ -100,6 +110,11 @@ urlpatterns = [
         views.ContestResultsView.as_view(),
         name='contest-results'
     ),
+    url(
+        r'^zakonczone/?$',
+        views.CompletedContestsView.as_view(),
+        name='completed-contests'
+    ),
     url(
         r'^zakonczone/(?P<contest_id>[0-9]+)/?$',
         views.CompletedContestView.as_view(),
@@ -110,6 +125,19 @@ urlpatterns = [
         views.ManageContestView.as_view(),
         name='contest-manage'
     ),
+    url(
+        (
+            r'^zawody/zarzadzaj/(?P<contest_id>[0-9]+)/'
+            r'lista_startowa\.(?P<export_format>csv|xlsx)$'
+        ),
+        login_required(views.StartListExportView.as_view()),
+        name='contest-start-list'
+    ),
+    url(
+        r'^zawody/zarzadzaj/(?P<contest_id>[0-9]+)/rozstawienie/?$',
+        login_required(views.SeedingView.as_view()),
+        name='contest-seeding'
+    ),
     url(
         r'^zawody/edytuj/(?P<contest_id>[0-9]+)/?$',
         login_required(views.ContestEditView.as_view()),
@@ -2,35 +2,112 @@
 from __future__ import unicode_literals
 
 from django.contrib.contenttypes.models import ContentType
+from django.db import connections
+from django.utils.dateparse import parse_datetime
+from django.utils.encoding import (
+    force_bytes,
+    force_text,
+)
 from django.utils.html import format_html
+from django.utils.http import (
+    urlsafe_base64_decode,
+    urlsafe_base64_encode,
+)
 
 
 class AdminUtils(object):
+    UNIT_LABELS = {'school': 'Szkoła', 'club': 'Klub'}
 
-    @staticmethod
-    def get_options(model, prefix, active_object_id, active_content_type):
-        options = []
-        content_type = ContentType.objects.get_for_model(model)
-
-        for organization in model.objects.all().order_by('name'):
-            selected = (
-                organization.id == active_object_id and
-                content_type == active_content_type
-            )
-            options.append(format_html(
-                '<option value="{}_{}" {}>[{}] {}</option>',
-                organization.id, content_type,
-                'selected' if selected else '',
-                prefix, organization.name
-            ))
-
-        return options
+    @classmethod
+    def get_unit_label(cls, unit_id, model_name, name):
+        """
+        Returns a value and a label of unit's option.
+        """
+        return (
+            '{}_{}'.format(unit_id, model_name),
+            '[{}] {}'.format(cls.UNIT_LABELS[model_name], name),
+        )
+
+    @classmethod
+    def get_option(cls, unit):
+        """
+        Returns a selected `<option>` of a unit.
+        """
+        value, label = cls.get_unit_label(
+            unit.pk, unit._meta.model_name, unit.name
+        )
+        return format_html(
+            '<option value="{}" selected>{}</option>', value, label
+        )
 
     @staticmethod
     def get_unit_id_and_type(unit):
         object_id, content_type = unit.split('_')
-        content_type = ContentType.objects.get(model=content_type)
+        content_type = ContentType.objects.get_by_natural_key(
+            'contest', content_type
+        )
 
         return object_id, content_type
 
 admin_utils = AdminUtils()
+
+
+def parse_time_result(value):
+    """
+    Converts a time in `mm:ss.cc` format to milliseconds.
+    """
+    time = int(value[:2]) * 60000 + int(value[3:5]) * 1000
+    return time + int(value[6:8]) * 10
+
+
+def format_time_result(time):
+    """
+    Converts a time in milliseconds to `mm:ss.cc` format.
+    """
+    minutes, time = divmod(int(time), 60000)
+    seconds, ms = divmod(time, 1000)
+    return '{:0>2}:{:0>2}.{:0>2}'.format(minutes, seconds, ms / 10)
+
+
+def encode_cursor(date, pk):
+    """
+    Encodes a position in a list ordered by a date and a pk.
+    """
+    return urlsafe_base64_encode(
+        force_bytes('{},{}'.format(date.isoformat(), pk))
+    )
+
+
+def decode_cursor(cursor):
+    """
+    Decodes a position encoded by `encode_cursor`, raises ValueError if it's
+    malformed.
+    """
+    try:
+        date, pk = force_text(urlsafe_base64_decode(cursor)).split(',')
+    except (TypeError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor.')
+    date = parse_datetime(date)
+    if date is None:
+        raise ValueError('Invalid cursor.')
+    return date, int(pk)
+
+
+def union_all(querysets, suffix='', params=()):
+    """
+    Runs UNION ALL of querysets selecting matching columns on the database
+    of the first one and returns its rows. `suffix` with its `params` is
+    appended to the query, e.g. ORDER BY and LIMIT clauses.
+    """
+    sqls = []
+    all_params = []
+    for queryset in querysets:
+        # Members of a compound query can't be ordered on their own.
+        sql, queryset_params = queryset.order_by().query.sql_with_params()
+        sqls.append(sql)
+        all_params.extend(queryset_params)
+    all_params.extend(params)
+
+    with connections[querysets[0].db].cursor() as cursor:
+        cursor.execute(' UNION ALL '.join(sqls) + suffix, all_params)
+        return cursor.fetchall()
@@ -4,12 +4,34 @@ from __future__ import unicode_literals
 from django.conf import settings
 from django.contrib.auth.mixins import PermissionRequiredMixin
 from django.core.mail import EmailMessage
-from django.http import HttpResponse
+from django.core.paginator import (
+    EmptyPage,
+    PageNotAnInteger,
+    Paginator,
+)
+from django.db import transaction
+from django.db.models import (
+    CharField,
+    Value,
+)
+from django.http import (
+    HttpResponse,
+    JsonResponse,
+)
 from django.shortcuts import render
 from django.template import loader
 from django.views.generic import View
 
-from contest.models import RushUser
+from contest.models import (
+    Club,
+    QueuedEmail,
+    RushUser,
+    School,
+)
+from contest.utils import (
+    admin_utils,
+    union_all,
+)
 
 
 class AccountsView(PermissionRequiredMixin, View):
@@ -24,7 +46,16 @@ class AccountsView(PermissionRequiredMixin, View):
         """
         Transfer RushUser model and render pages 'administratorzy/konta'.
         """
-        users = RushUser.objects.filter(is_active=False)
+        paginator = Paginator(
+            RushUser.objects.filter(is_active=False).order_by('pk'),
+            settings.ACCOUNTS_PAGE_SIZE
+        )
+        try:
+            users = paginator.page(request.GET.get('page'))
+        except PageNotAnInteger:
+            users = paginator.page(1)
+        except EmptyPage:
+            users = paginator.page(paginator.num_pages)
 
         return render(request, self.template_name, {'users': users})
 
@@ -53,9 +84,9 @@ class AccountsView(PermissionRequiredMixin, View):
         return HttpResponse(status=204)
 
     @staticmethod
-    def send_rejection_email(email):
+    def get_rejection_email(email):
         """
-        Send a email notification about removal user.
+        Returns a email notification about removal user.
         """
         support = settings.SUPPORT_EMAIL
         template = ('email/rejection_account.html',)
@@ -64,7 +95,73 @@ class AccountsView(PermissionRequiredMixin, View):
             'Podanie o konto odrzucone', text, support, [email]
         )
         msg.content_subtype = 'html'
-        msg.send()
+        return msg
+
+    @classmethod
+    def send_rejection_email(cls, email):
+        """
+        Send a email notification about removal user.
+        """
+        QueuedEmail.objects.enqueue(cls.get_rejection_email(email))
+
+
+class AccountsBatchView(PermissionRequiredMixin, View):
+    """
+    Creates or discards accounts of many users at once and reports a status
+    of each of them.
+    """
+    permission_required = 'is_staff'
+
+    def _create(self, request, user_ids):
+        users = RushUser.objects.activate(user_ids)
+        QueuedEmail.objects.enqueue_many(
+            user.get_reset_password_email(request, True) for user in users
+        )
+        return [user.pk for user in users]
+
+    def _discard(self, request, user_ids):
+        users = RushUser.objects.filter(
+            pk__in=user_ids, is_active=False
+        ).values_list('pk', 'email')
+        with transaction.atomic():
+            users = list(users.select_for_update())
+            RushUser.objects.filter(pk__in=[pk for pk, _ in users]).delete()
+            QueuedEmail.objects.enqueue_many(
+                AccountsView.get_rejection_email(email) for _, email in users
+            )
+        return [pk for pk, _ in users]
+
+    def post(self, request):
+        """
+        Creates (`action=create`) or discards (`action=discard`) accounts
+        of inactive users from `users` list.
+        """
+        action = {
+            'create': self._create,
+            'discard': self._discard,
+        }.get(request.POST.get('action'))
+        try:
+            user_ids = set(int(pk) for pk in request.POST.getlist('users'))
+        except ValueError:
+            action = None
+        if action is None or not user_ids:
+            return HttpResponse(status=400)
+
+        done = set(action(request, user_ids))
+        active = set(RushUser.objects.filter(
+            pk__in=user_ids - done
+        ).values_list('pk', flat=True))
+
+        report = []
+        for pk in sorted(user_ids):
+            if pk in done:
+                status = 'done'
+            elif pk in active:
+                status = 'active'
+            else:
+                status = 'missing'
+            report.append({'id': pk, 'status': status})
+        return JsonResponse({'users': report})
 
 
 class CancelNotificationsView(View):
@@ -91,3 +188,48 @@ class CancelNotificationsView(View):
             request, self.template_name,
             {'msg': 'Powiadomienia odnośnie nowych zawodów zostały wyłączone.'}
         )
+
+
+class UnitSearchView(PermissionRequiredMixin, View):
+    """
+    Searches schools and clubs by a name prefix for the admin's unit picker.
+    """
+    permission_required = 'is_staff'
+
+    @staticmethod
+    def _search(prefix, page, page_size):
+        """
+        Returns units from given page, sorted by name, and whether there are
+        more of them. Schools and clubs are paged by a single query, so
+        pages follow the database's collation and don't overlap.
+        """
+        units = union_all(
+            [
+                model.objects.filter(name__istartswith=prefix).annotate(
+                    model_name=Value(model._meta.model_name, CharField())
+                ).values_list('name', 'pk', 'model_name')
+                for model in (School, Club)
+            ],
+            ' ORDER BY 1, 3, 2 LIMIT %s OFFSET %s',
+            [page_size + 1, (page - 1) * page_size]
+        )
+        return units[:page_size], len(units) > page_size
+
+    def get(self, request, *args, **kwargs):
+        """
+        Return a page of units matching `q` prefix.
+        """
+        try:
+            page = max(int(request.GET.get('strona', 1)), 1)
+        except ValueError:
+            page = 1
+        units, more = self._search(
+            request.GET.get('q', '').strip(), page,
+            settings.UNIT_SEARCH_PAGE_SIZE
+        )
+
+        results = []
+        for name, pk, model_name in units:
+            value, label = admin_utils.get_unit_label(pk, model_name, name)
+            results.append({'id': value, 'text': label})
+        return JsonResponse({'results': results, 'more': more})
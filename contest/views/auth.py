@@ -26,7 +26,10 @@ from contest.forms import (
     RushSetPasswordForm,
     RushResetPasswordForm,
 )
-from contest.models import RushUser
+from contest.models import (
+    QueuedEmail,
+    RushUser,
+)
 
 
 class RegisterView(View):
@@ -58,7 +61,7 @@ class RegisterView(View):
             'Nowe zapytanie o konto', text, settings.SUPPORT_EMAIL, emails
         )
         msg.content_subtype = 'html'
-        msg.send()
+        QueuedEmail.objects.enqueue(msg)
 
     def get(self, request, *args, **kwargs):
         """
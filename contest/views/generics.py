@@ -1,15 +1,32 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
+from collections import Counter
+from itertools import groupby
 from urlparse import urljoin
 
 from django.conf import settings
 from django.contrib.auth.mixins import PermissionRequiredMixin
 from django.core.mail import EmailMessage
+from django.core.paginator import (
+    EmptyPage,
+    PageNotAnInteger,
+    Paginator,
+)
 from django.core.urlresolvers import reverse
+from django.db import transaction
+from django.db.models import (
+    Max,
+    Prefetch,
+)
 from django.forms import (
     formset_factory,
     inlineformset_factory,
 )
+from django.http import (
+    FileResponse,
+    HttpResponseBadRequest,
+    StreamingHttpResponse,
+)
 from django.shortcuts import (
     render,
     redirect,
@@ -22,19 +39,39 @@ from django.views.generic import (
     View,
 )
 
+from contest.catalog import catalog
 from contest.models import (
     Contest,
     Contestant,
-    Style,
-    Distance,
     ContestantScore,
+    ContestResult,
+    Distance,
+    QueuedEmail,
     RushUser,
+    Style,
+    update_entry_counts,
+)
+from contest.exports import (
+    get_start_list_rows,
+    stream_csv,
+    write_xlsx,
 )
 from contest.forms import (
     ContestantForm,
     ContestForm,
     ContestResultsForm,
+    ContestResultsImportForm,
 )
+from contest.fragments import (
+    get_completed_items,
+    get_home_fragments,
+    get_manageable,
+)
+from contest.seeding import (
+    get_seeding_rows,
+    seed_events,
+)
+from contest.utils import parse_time_result
 
 
 class HomeView(TemplateView):
@@ -46,16 +83,44 @@ class HomeView(TemplateView):
     def get_context_data(self, **kwargs):
         context = super(HomeView, self).get_context_data(**kwargs)
 
-        context['upcoming'] = Contest.objects.filter(
-            date__gte=timezone.now()
-        ).order_by('date')
-        context['completed'] = Contest.objects.filter(
-            date__lt=timezone.now()
-        ).order_by('-date')
+        fragments = get_home_fragments()
+        context['upcoming'] = fragments['upcoming']
+        context['completed'] = fragments['completed']
+        context['next_cursor'] = fragments['next_cursor']
+        context['manageable'] = get_manageable(
+            self.request.user,
+            [item['contest'] for item in fragments['completed']]
+        )
 
         return context
 
 
+class CompletedContestsView(View):
+    """
+    Next page of completed contests, loaded from the home page.
+    """
+    template_name = 'contest/home/completed_contests.html'
+
+    def get(self, request, *args, **kwargs):
+        """
+        Return completed contests placed after a given cursor.
+        """
+        try:
+            contests, next_cursor = Contest.objects.completed().seek(
+                request.GET.get('kursor'),
+                settings.COMPLETED_CONTESTS_PAGE_SIZE
+            )
+        except ValueError:
+            return HttpResponseBadRequest()
+
+        context = {
+            'completed': get_completed_items(contests),
+            'next_cursor': next_cursor,
+            'manageable': get_manageable(request.user, contests),
+        }
+        return render(request, self.template_name, context)
+
+
 class ContestantAddView(View):
     """
     View for contestant assigning.
@@ -74,13 +139,17 @@ class ContestantAddView(View):
         return 'Zawody się już skończyły.'
 
     @staticmethod
-    def get_formset(contest_id, user, data=None):
+    def get_formset(contest_id, user, data=None, contest=None):
         """
         Returns formset of `ContestantForm` forms.
         """
         formset_class = formset_factory(ContestantForm, extra=1)
         formset_class.form = staticmethod(
-            curry(ContestantForm, contest_id=contest_id, user=user)
+            curry(
+                ContestantForm, contest_id=contest_id, user=user,
+                contest=contest,
+                is_individual_contestant=user.is_individual_contestant
+            )
         )
 
         return formset_class(data) if data else formset_class()
@@ -107,7 +176,7 @@ class ContestantAddView(View):
             subject, text, settings.SUPPORT_EMAIL, [self.request.user.email],
         )
         msg.content_subtype = 'html'
-        msg.send()
+        QueuedEmail.objects.enqueue(msg)
 
     def _can_sign_in(self, contest_id):
         return not (
@@ -118,17 +187,71 @@ class ContestantAddView(View):
         )
 
     @staticmethod
-    def _save_styles(raw_styles, contestant):
+    def _get_scores(raw_styles, contestant):
+        """
+        Returns unsaved scores of a contestant described by `raw_styles`.
+        """
+        scores = []
         for score in raw_styles.split(';'):
             score = score.split(',')
-            style = Style.objects.get(name=score[0])
-            distance = Distance.objects.get(value=score[1])
-            time = int(score[2][:2]) * 60000 + int(score[2][3:5]) * 1000
-            time += int(score[2][6:8]) * 10
-            ContestantScore.objects.create(
-                contestant=contestant, style=style, distance=distance,
-                time_result=time
+            scores.append(ContestantScore(
+                contestant=contestant,
+                style=catalog.get_style(score[0]),
+                distance=catalog.get_distance(score[1]),
+                time_result=parse_time_result(score[2])
+            ))
+        return scores
+
+    def _save_contestants(self, formset, contest):
+        """
+        Saves contestants of a valid formset along with their scores in
+        a single transaction, using a constant number of queries.
+        """
+        user = self.request.user
+
+        with transaction.atomic():
+            contestants = Contestant.objects.filter(
+                contest=contest, moderator=user
             )
+            last_pk = contestants.aggregate(
+                last_pk=Max('pk')
+            )['last_pk'] or 0
+
+            new_contestants = []
+            for form in formset:
+                contestant = form.save(commit=False)
+                contestant.moderator = user
+                contestant.contest = contest
+                new_contestants.append(contestant)
+            Contestant.objects.bulk_create(new_contestants)
+
+            # Not every backend sets primary keys on a bulk insert,
+            # so the rows are read back in the insertion order.
+            new_contestants = list(
+                contestants.filter(pk__gt=last_pk).order_by('pk')
+            )
+            scores = []
+            for contestant, form in zip(new_contestants, formset):
+                scores.extend(self._get_scores(
+                    form.cleaned_data['styles'], contestant
+                ))
+            ContestantScore.objects.bulk_create(scores)
+            # Bulk inserts don't send signals which keep the counters.
+            update_entry_counts(
+                contest.pk, len(new_contestants),
+                Counter(score.style_id for score in scores)
+            )
+
+        return contestants.filter(pk__gt=last_pk).order_by(
+            'pk'
+        ).prefetch_related(
+            Prefetch(
+                'contestantscore_set',
+                queryset=ContestantScore.objects.select_related(
+                    'style', 'distance'
+                )
+            )
+        )
 
     def get(self, request, contest_id, *args, **kwargs):
         """
@@ -141,7 +264,7 @@ class ContestantAddView(View):
                 {'message': 'Jesteś już zapisany na ten konkurs'}
             )
 
-        organization = request.user.unit
+        organization = request.user.unit_name
         formset = self.get_formset(contest_id, request.user)
 
         try:
@@ -170,11 +293,16 @@ class ContestantAddView(View):
         """
         Create a contestant.
         """
-        formset = self.get_formset(contest_id, request.user, request.POST)
-
         try:
             contest = Contest.objects.get(pk=contest_id)
         except Contest.DoesNotExist:
+            contest = None
+
+        formset = self.get_formset(
+            contest_id, request.user, request.POST, contest
+        )
+
+        if contest is None:
             return render(
                 request, self.template_name, {'message': self._get_message()}
             )
@@ -187,15 +315,7 @@ class ContestantAddView(View):
         )
 
         if formset.is_valid():
-            contestants = []
-            for form in formset:
-                contestant = form.save(commit=False)
-                contestant.moderator = request.user
-                contestant.contest = contest
-                contestant.save()
-                self._save_styles(form.cleaned_data['styles'], contestant)
-                contestants.append(contestant)
-
+            contestants = self._save_contestants(formset, contest)
             self.send_email_with_contestant(contestants, link)
 
             msg = (
@@ -249,9 +369,10 @@ class ContestantListView(View):
         """
         contest = Contest.objects.get(pk=contest_id)
         is_contest_organizer = self._is_contest_organizer(request, contest)
-        contestants = self._get_contestants(
+        # Rows are rendered anyway, so loading them also checks emptiness.
+        contestants = list(self._get_contestants(
             is_contest_organizer, contest, request
-        )
+        ))
         msg = self._get_msg(is_contest_organizer, contestants)
 
         context = {
@@ -289,7 +410,7 @@ class EditContestantView(View):
             user=user,
         )
 
-        if not contestant.moderator == request.user:
+        if contestant.moderator_id != request.user.pk:
             return render(
                 request, self.template_name,
                 {'msg': 'Nie możesz edytować tego zawodnika.'},
@@ -358,7 +479,8 @@ class ContestAddView(PermissionRequiredMixin, View):
         *args, **kwargs
     ):
         """
-        Sends an email with a list contestants
+        Queues an email about a new contest, sent to `recipient_list`
+        in BCC chunks of `NOTIFICATION_CHUNK_SIZE` addresses.
         """
         cancel_notifications_link = urljoin(
             'http://{}'.format(request.get_host()),
@@ -376,10 +498,11 @@ class ContestAddView(PermissionRequiredMixin, View):
             subject='Stworzono nowe zawody',
             body=body,
             from_email=settings.SUPPORT_EMAIL,
-            bcc=recipient_list,
         )
         msg.content_subtype = 'html'
-        msg.send()
+        QueuedEmail.objects.enqueue_in_chunks(
+            msg, recipient_list, settings.NOTIFICATION_CHUNK_SIZE
+        )
 
     def get(self, request):
         """
@@ -395,15 +518,13 @@ class ContestAddView(PermissionRequiredMixin, View):
         form = self.form_class(request.POST, request.FILES, user=request.user)
         if form.is_valid():
             contest = form.save()
-            recipient_list = list(
-                RushUser.objects.filter(
-                    notifications=True, is_active=True
-                ).exclude(
-                    email=request.user.email
-                ).values_list(
-                    'email', flat=True
-                )
-            )
+            recipient_list = RushUser.objects.filter(
+                notifications=True, is_active=True
+            ).exclude(
+                email=request.user.email
+            ).values_list(
+                'email', flat=True
+            ).iterator()
             add_contestant_link = 'http://{}{}'.format(
                 request.get_host(),
                 reverse(
@@ -431,19 +552,17 @@ class ContestAddView(PermissionRequiredMixin, View):
         return render(request, self.template_name, {'form': form})
 
 
-class ContestResultsAddView(View):
+class ContestOrganizerMixin(object):
     """
-    View for adding contest results.
+    Checks whether a user is allowed to manage a contest.
     """
-    template_name = 'contest/add_results.html'
-    form_class = ContestResultsForm
 
     @staticmethod
     def _is_contest_organizer(user, contest):
         """
         Checks if contest is created by this user.
         """
-        return user == contest.created_by
+        return user.pk == contest.created_by_id
 
     @staticmethod
     def _is_contest_moderator(user, contest):
@@ -453,14 +572,14 @@ class ContestResultsAddView(View):
         """
         return (
             user.is_moderator and
-            user.content_type == contest.content_type and
+            user.content_type_id == contest.content_type_id and
             user.object_id == contest.object_id
         )
 
-    def _can_add_result(self, user, contest):
+    def _can_manage_contest(self, user, contest):
         """
         Both a contest's creator and a moderator of an organization that
-        belongs to the contest should be able to add results.
+        belongs to the contest should be able to manage it.
         """
         return (
             self._is_contest_organizer(user, contest) or
@@ -468,28 +587,52 @@ class ContestResultsAddView(View):
             user.is_staff
         )
 
+
+class ContestResultsAddView(ContestOrganizerMixin, View):
+    """
+    View for adding contest results.
+    """
+    template_name = 'contest/add_results.html'
+    form_class = ContestResultsForm
+    import_form_class = ContestResultsImportForm
+
     def get(self, request, contest_id, *args, **kwargs):
         """
         Return clear form.
         """
         contest = Contest.objects.get(pk=contest_id)
-        if self._can_add_result(request.user, contest) is False:
+        if self._can_manage_contest(request.user, contest) is False:
             return redirect('contest:home')
-        form = self.form_class(instance=contest)
-        return render(request, self.template_name, {'form': form})
+        context = {
+            'form': self.form_class(instance=contest),
+            'import_form': self.import_form_class(contest=contest),
+        }
+        return render(request, self.template_name, context)
 
     def post(self, request, contest_id, *args, **kwargs):
         """
-        Save results.
+        Save results, either as a text or imported from a CSV file.
         """
         contest = Contest.objects.get(pk=contest_id)
-        if self._can_add_result(request.user, contest) is False:
+        if self._can_manage_contest(request.user, contest) is False:
             return redirect('contest:home')
-        form = self.form_class(request.POST, instance=contest)
-        if form.is_valid():
-            form.save(commit=True)
+
+        form = self.form_class(instance=contest)
+        import_form = self.import_form_class(contest=contest)
+        if 'results_file' in request.FILES:
+            import_form = self.import_form_class(
+                request.POST, request.FILES, contest=contest
+            )
+            valid_form = import_form
+        else:
+            form = self.form_class(request.POST, instance=contest)
+            valid_form = form
+
+        if valid_form.is_valid():
+            valid_form.save()
             return redirect('contest:contest-results', contest_id=contest_id)
-        return render(request, self.template_name, {'form': form})
+        context = {'form': form, 'import_form': import_form}
+        return render(request, self.template_name, context)
 
 
 class ContestResultsView(View):
@@ -499,19 +642,38 @@ class ContestResultsView(View):
     template_name = 'contest/contest_results.html'
 
     @staticmethod
-    def _get_results(contest_id, request):
+    def _get_page(contest, request):
         """
-        Returns a results queryset.
+        Returns a page of contest's structured results.
         """
-        contest = Contest.objects.get(pk=contest_id)
-        return contest.results
+        results = ContestResult.objects.filter(contest=contest).select_related(
+            'contestant', 'style', 'distance'
+        ).order_by('style', 'distance', 'place')
+        paginator = Paginator(results, settings.RESULTS_PAGE_SIZE)
+        try:
+            return paginator.page(request.GET.get('page'))
+        except PageNotAnInteger:
+            return paginator.page(1)
+        except EmptyPage:
+            return paginator.page(paginator.num_pages)
+
+    @staticmethod
+    def _group_by_event(page):
+        """
+        Groups page's results by a style and a distance.
+        """
+        return [
+            (event, list(results)) for event, results in groupby(
+                page, lambda result: (result.style, result.distance)
+            )
+        ]
 
     @staticmethod
-    def _get_msg(results=None):
+    def _get_msg(results=None, page=None):
         """
         Returns a message.
         """
-        if not results:
+        if not results and not (page and page.paginator.count):
             return 'Nie dodano jeszcze wyników.'
         return ''
 
@@ -520,14 +682,15 @@ class ContestResultsView(View):
         Get results data.
         """
         contest = Contest.objects.get(pk=contest_id)
-        results = self._get_results(
-            contest_id, request
-        )
-        msg = self._get_msg(results)
+        results = contest.results
+        page = self._get_page(contest, request)
+        msg = self._get_msg(results, page)
 
         context = {
             'contest': contest,
             'results': results,
+            'page': page,
+            'events': self._group_by_event(page),
             'msg': msg,
         }
         return render(request, self.template_name, context)
@@ -581,16 +744,100 @@ class ManageContestView(View):
         Return contest details.
         """
         contest = Contest.objects.get(pk=contest_id)
-        contestants = self._get_contestants(contest, request)
+        # Rows are rendered anyway, so loading them also checks emptiness.
+        # Unlike the counter, their number includes contestants inserted
+        # without signals, e.g. by `loaddata`.
+        contestants = list(self._get_contestants(contest, request))
+        style_entry_counts = contest.style_entry_counts.filter(
+            count__gt=0
+        ).select_related('style').order_by('style') if contestants else []
         msg = self._get_msg(contestants)
         context = {
             'contest': contest,
             'contestants': contestants,
+            'contestant_count': len(contestants),
+            'style_entry_counts': style_entry_counts,
             'msg': msg,
         }
         return render(request, self.template_name, context)
 
 
+class StartListExportView(ContestOrganizerMixin, View):
+    """
+    Exports contest's start list as a CSV or XLSX file.
+    """
+    xlsx_content_type = (
+        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+
+    def get(self, request, contest_id, export_format, *args, **kwargs):
+        """
+        Return start list file.
+        """
+        contest = Contest.objects.get(pk=contest_id)
+        if self._can_manage_contest(request.user, contest) is False:
+            return redirect('contest:home')
+
+        rows = get_start_list_rows(contest)
+        if export_format == 'csv':
+            response = StreamingHttpResponse(
+                stream_csv(rows), content_type='text/csv; charset=utf-8'
+            )
+        else:
+            response = FileResponse(
+                write_xlsx(rows), content_type=self.xlsx_content_type
+            )
+        response['Content-Disposition'] = (
+            'attachment; filename="lista_startowa_{}.{}"'.format(
+                contest.pk, export_format
+            )
+        )
+        return response
+
+
+class SeedingView(ContestOrganizerMixin, View):
+    """
+    Heats and lanes of contest's events, seeded by entry times.
+    """
+    template_name = 'contest/seeding.html'
+
+    @staticmethod
+    def _get_events(contest, circle):
+        """
+        Returns seeded events with their styles and distances resolved.
+        """
+        genders = dict(Contestant.GENDERS)
+        events = seed_events(
+            get_seeding_rows(contest), settings.SEEDING_LANES,
+            settings.SEEDING_YEAR_BAND, circle
+        )
+        return [
+            {
+                'style': catalog.get(Style, event.style_id),
+                'distance': catalog.get(Distance, event.distance_id),
+                'gender': genders[event.gender],
+                'years': event.years,
+                'heats': event.heats,
+            } for event in events
+        ]
+
+    def get(self, request, contest_id, *args, **kwargs):
+        """
+        Return seeded events.
+        """
+        contest = Contest.objects.get(pk=contest_id)
+        if self._can_manage_contest(request.user, contest) is False:
+            return redirect('contest:home')
+
+        circle = request.GET.get('rozstawienie') == 'kolowe'
+        context = {
+            'contest': contest,
+            'circle': circle,
+            'events': self._get_events(contest, circle),
+        }
+        return render(request, self.template_name, context)
+
+
 class ContestEditView(View):
     permission_required = 'contest.add_contest'
     template_name = 'contest/contest_edit.html'
@@ -89,11 +89,20 @@ def deploy(branch='develop'):
             run('pkill gunicorn')
         except SystemExit:
             pass
+        try:
+            run('pkill -f send_queued_emails')
+        except SystemExit:
+            pass
 
         run('git pull origin {}'.format(branch))
         run('python manage.py migrate')
         run('pip install -r requirements.pip')
         run('service nginx restart')
+        run(
+            'nohup python manage.py send_queued_emails --loop '
+            '--settings=rush.local_settings > /dev/null 2>&1 &',
+            pty=False
+        )
         run(
             'gunicorn --bind 127.0.0.1:8001 rush.wsgi:application '
             '--settings=rush.local_settings'
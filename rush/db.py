@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+from contextlib import contextmanager
+import random
+import threading
+
+from django.conf import settings
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    connections,
+)
+
+_local = threading.local()
+
+
+def close_unusable_connections(**kwargs):
+    """
+    Signal receiver closing persistent connections which were dropped by
+    the server since the last request, so requests don't fail on them.
+    Checks only connections with `CONN_HEALTH_CHECKS` option.
+    """
+    for connection in connections.all():
+        if (
+            connection.connection is not None and
+            connection.settings_dict.get('CONN_HEALTH_CHECKS') and
+            not connection.in_atomic_block and not connection.is_usable()
+        ):
+            connection.close()
+
+
+def get_replica():
+    """
+    Returns an alias of a random replica, or the default database if there
+    are no `DATABASE_REPLICAS`.
+    """
+    if not settings.DATABASE_REPLICAS:
+        return DEFAULT_DB_ALIAS
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+def start_replica_reads(pinned=False):
+    """
+    Makes reads of this thread go to a replica, until a write or
+    `stop_replica_reads`. Reads of a pinned thread stay on the default
+    database.
+    """
+    _local.replica = None if pinned else get_replica()
+    _local.written = False
+
+
+def stop_replica_reads():
+    """
+    Makes reads go to the default database again. Returns whether anything
+    was written since `start_replica_reads`.
+    """
+    written = getattr(_local, 'written', False)
+    _local.replica = None
+    _local.written = False
+    return written
+
+
+@contextmanager
+def use_replica():
+    """
+    Makes reads inside the block go to a replica, until a write.
+    """
+    start_replica_reads()
+    try:
+        yield _local.replica
+    finally:
+        stop_replica_reads()
+
+
+class ReplicaRouter(object):
+    """
+    Sends reads between `start_replica_reads` and `stop_replica_reads` to
+    a replica. Writes, and reads of objects related to ones read from
+    a replica later on, go to the default database. Replicas get their
+    schema by replication, so they aren't migrated.
+    """
+
+    def _get_default(self, hints):
+        instance = hints.get('instance')
+        if (
+            instance is not None and
+            instance._state.db in settings.DATABASE_REPLICAS
+        ):
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def db_for_read(self, model, **hints):
+        return getattr(_local, 'replica', None) or self._get_default(hints)
+
+    def db_for_write(self, model, **hints):
+        # Replicas lag behind, so reads after a write could miss it.
+        _local.replica = None
+        _local.written = True
+        return self._get_default(hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = [DEFAULT_DB_ALIAS] + list(settings.DATABASE_REPLICAS)
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
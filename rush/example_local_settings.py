@@ -9,11 +9,31 @@ Then, to run server with them, provide extra argument `--settings`, e.g.
 ./manage.py runserver --settings=rush.local_settings
 """
 
+import tempfile
+
 from rush.settings import *
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+    },
+    # Not a copy of the default database, so it's left out of
+    # `DATABASE_REPLICAS`; replica routing tests use it as a replica.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db_replica.sqlite3'),
+    },
+}
+
+# A file based stand-in for memcached, separate for every process.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(
+            tempfile.gettempdir(), 'rush-cache-{}'.format(os.getpid())
+        ),
+        'KEY_PREFIX': 'rush',
+        'KEY_FUNCTION': 'contest.cache.make_key',
     }
 }
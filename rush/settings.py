@@ -46,12 +46,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE_CLASSES = [
+    'contest.middleware.QueryProfilingMiddleware',
+    'contest.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.auth.middleware.SessionAuthenticationMiddleware',
+    'contest.middleware.UserRolesMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -93,8 +96,18 @@ DATABASES = {
         'PASSWORD': 'root',
         'HOST': 'localhost',
         'PORT': '3306',
+        # Connections are kept open between requests, and checked before
+        # being reused, see `rush.db.close_unusable_connections`.
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
+# Aliases of read-only replicas of the default database, which serve reads
+# of GET requests, see `contest.middleware.ReplicaRoutingMiddleware`.
+DATABASE_REPLICAS = []
+# Seconds for which a client reads from the default database after a write.
+DATABASE_REPLICA_PIN_TIME = 10
+DATABASE_ROUTERS = ['rush.db.ReplicaRouter']
 
 # Password validation
 # https://docs.djangoproject.com/en/1.9/ref/settings/#auth-password-validators
@@ -133,6 +146,18 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10
 }
 
+# Cache shared by all workers. Keys are built by `contest.cache.make_key`;
+# features caching values should use `contest.cache.get_key` namespaces.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': '127.0.0.1:11211',
+        'KEY_PREFIX': 'rush',
+        'KEY_FUNCTION': 'contest.cache.make_key',
+    }
+}
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
 # Internationalization
 # https://docs.djangoproject.com/en/1.9/topics/i18n/
 
@@ -159,5 +184,34 @@ SUPPORT_EMAIL = 'Sample@email.com'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Outgoing emails queue, see `send_queued_emails` management command.
+EMAIL_QUEUE_BATCH_SIZE = 50
+EMAIL_QUEUE_MAX_ATTEMPTS = 5
+EMAIL_QUEUE_RETRY_DELAY = 60
+# Seconds a claimed batch is hidden from other senders while being sent.
+EMAIL_QUEUE_LEASE_TIME = 600
+# Max number of BCC recipients of a single new contest notification.
+NOTIFICATION_CHUNK_SIZE = 100
+# Number of structured results displayed on a single results page.
+RESULTS_PAGE_SIZE = 100
+# Max lifetime of cached home page fragments, in seconds.
+HOME_CACHE_TIMEOUT = 60 * 60
+# Number of completed contests loaded at once on the home page.
+COMPLETED_CONTESTS_PAGE_SIZE = 10
+# Number of objects read at once by a streamed API list, see
+# `api.views.StreamingListMixin`.
+API_STREAMING_CHUNK_SIZE = 500
+# Number of inactive users listed at once on the accounts page.
+ACCOUNTS_PAGE_SIZE = 50
+# Number of schools and clubs returned by a single unit search.
+UNIT_SEARCH_PAGE_SIZE = 20
+# Per-request queries and render time report, see
+# `contest.middleware.QueryProfilingMiddleware`.
+QUERY_PROFILING = False
+QUERY_BUDGET = 30
+# Heats seeding, see `contest.seeding`.
+SEEDING_LANES = 6
+SEEDING_YEAR_BAND = 2
+
 MAX_UPLOAD_SIZE = 10 * 1024 * 1024
 PERMITTED_EXTENSION = ('.pdf', '.doc', '.docx', '.ods', '.xls',)